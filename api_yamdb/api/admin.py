@@ -0,0 +1,37 @@
+from django.contrib import admin
+from django.http import Http404
+from django.template.response import TemplateResponse
+
+from api import slowlog
+
+
+def slow_request_list(request):
+    """Список сохраненных медленных запросов с фильтром по маршруту."""
+    entries = slowlog.read_entries()
+    routes = sorted({entry['route'] or '' for entry in entries})
+    route = request.GET.get('route')
+    if route:
+        entries = [entry for entry in entries if entry['route'] == route]
+    return TemplateResponse(
+        request, 'admin/slow_requests/list.html', {
+            **admin.site.each_context(request),
+            'title': 'Медленные запросы',
+            'entries': entries,
+            'routes': routes,
+            'current_route': route,
+        }
+    )
+
+
+def slow_request_detail(request, entry_id):
+    """Запрос с SQL-запросами, их длительностью и планами."""
+    entry = slowlog.get_entry(entry_id)
+    if entry is None:
+        raise Http404('Запись не найдена.')
+    return TemplateResponse(
+        request, 'admin/slow_requests/detail.html', {
+            **admin.site.each_context(request),
+            'title': f'{entry["method"]} {entry["path"]}',
+            'entry': entry,
+        }
+    )
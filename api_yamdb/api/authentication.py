@@ -0,0 +1,152 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.tokens import get_token_version
+
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с именем, ролью и флагами пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    Пользователь, восстановленный из утверждений access-токена.
+    Имя, роль и флаги берутся из токена, полный объект модели загружается
+    из БД только при обращении к остальным атрибутам, например при
+    сохранении автора отзыва или в эндпоинте users/me/. После загрузки
+    эти поля тоже читаются из объекта модели, чтобы изменения, сохраненные
+    через request.user, были видны в том же запросе.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, claims):
+        super().__init__(
+            lambda: get_user_model().objects.get(pk=user_id)
+        )
+        self.__dict__['_user_id'] = user_id
+        self.__dict__['_claims'] = claims
+
+    @property
+    def pk(self):
+        return self._user_id
+
+    id = pk
+
+    def _get_claim(self, name):
+        if self._wrapped is empty:
+            return self._claims[name]
+        return getattr(self._wrapped, name)
+
+    @property
+    def username(self):
+        return self._get_claim('username')
+
+    @property
+    def role(self):
+        return self._get_claim('role')
+
+    @property
+    def is_staff(self):
+        return self._get_claim('is_staff')
+
+    @property
+    def is_superuser(self):
+        return self._get_claim('is_superuser')
+
+    @property
+    def is_admin(self):
+        return (
+            self.is_staff or self.is_superuser
+            or self.role == get_user_model().ADMIN
+        )
+
+    @property
+    def is_moderator(self):
+        return self.role == get_user_model().MODERATOR
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, get_user_model())):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без запроса пользователя из БД.
+    Версия токена сверяется с кэшированной версией пользователя: после
+    смены роли или флагов старые токены отклоняются. Токены без
+    утверждений обрабатываются как обычно, с загрузкой пользователя.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = get_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден или заблокирован.',
+                code='user_not_found'
+            )
+        if version != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен.',
+                code='token_outdated'
+            )
+        return TokenUser(
+            user_id,
+            {claim: validated_token.get(claim) for claim in USER_CLAIMS}
+        )
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Аутентификация сборщика метрик по заголовку
+    `Authorization: Bearer <METRICS_TOKEN>`. Пользователь остается
+    анонимным; другие токены проверяют следующие классы аутентификации.
+    Без METRICS_TOKEN класс ничего не делает.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        scheme, _, value = request.META.get(
+            'HTTP_AUTHORIZATION', ''
+        ).partition(' ')
+        if not token or scheme != 'Bearer' or not hmac.compare_digest(
+            value.encode(), token.encode()
+        ):
+            return None
+        return AnonymousUser(), None
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="metrics"'
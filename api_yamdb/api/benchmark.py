@@ -0,0 +1,408 @@
+import asyncio
+import http.client
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connections
+
+from api.authentication import ClaimsAccessToken
+from reviews.models import Comment, Genre, Review, Title
+
+User = get_user_model()
+
+# Запрос сценария: name - имя для отчета, data - параметры строки
+# запроса для GET или тело JSON для остальных методов.
+Request = namedtuple('Request', 'name method path data token')
+Response = namedtuple('Response', 'status body')
+
+PERCENTILES = (50, 95, 99)
+# Сколько объектов каждого вида берется из БД для выбора в сценариях.
+CONTEXT_SAMPLE_SIZE = 1000
+CONTEXT_USERS = 50
+
+
+class BenchmarkContext:
+    """Идентификаторы объектов БД, из которых сценарии выбирают цели."""
+
+    def __init__(self):
+        self.title_ids = list(
+            Title.objects.order_by('?').values_list(
+                'id', flat=True
+            )[:CONTEXT_SAMPLE_SIZE]
+        )
+        self.title_pages = max(
+            1, math.ceil(Title.objects.count() / settings.REST_FRAMEWORK[
+                'PAGE_SIZE'
+            ])
+        )
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.reviews = list(
+            Review.objects.order_by('?').values_list(
+                'title_id', 'id'
+            )[:CONTEXT_SAMPLE_SIZE]
+        )
+        self.tokens = [
+            str(ClaimsAccessToken.for_user(user))
+            for user in User.objects.filter(
+                role=User.USER, is_active=True
+            )[:CONTEXT_USERS]
+        ]
+
+    def counts(self):
+        return {
+            'users': User.objects.count(),
+            'genres': len(self.genres),
+            'titles': Title.objects.count(),
+            'reviews': Review.objects.count(),
+            'comments': Comment.objects.count(),
+        }
+
+
+def title_list(context, rng):
+    yield Request('title_list', 'GET', '/api/v1/titles/', {
+        'genre': rng.choice(context.genres), 'ordering': '-rating',
+    }, None)
+
+
+def title_page(context, rng):
+    yield Request('title_page', 'GET', '/api/v1/titles/', {
+        'page': rng.randint(1, context.title_pages),
+    }, None)
+
+
+def title_detail(context, rng):
+    yield Request(
+        'title_detail', 'GET',
+        f'/api/v1/titles/{rng.choice(context.title_ids)}/', {}, None
+    )
+
+
+def review_page(context, rng):
+    title_id, _ = rng.choice(context.reviews)
+    yield Request(
+        'review_page', 'GET', f'/api/v1/titles/{title_id}/reviews/', {},
+        None
+    )
+
+
+def comment_page(context, rng):
+    title_id, review_id = rng.choice(context.reviews)
+    yield Request(
+        'comment_page', 'GET',
+        f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/', {}, None
+    )
+
+
+def comment_post(context, rng):
+    title_id, review_id = rng.choice(context.reviews)
+    yield Request(
+        'comment_post', 'POST',
+        f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        {'text': 'Комментарий из нагрузочного теста.'},
+        rng.choice(context.tokens)
+    )
+
+
+def signup_token(context, rng):
+    """Регистрация и получение токена по коду из письма."""
+    username = f'bench{rng.getrandbits(48):x}'
+    yield Request('signup', 'POST', '/api/v1/auth/signup/', {
+        'username': username, 'email': f'{username}@bench.fake',
+    }, None)
+    user = User.objects.get(username=username)
+    yield Request('token', 'POST', '/api/v1/auth/token/', {
+        'username': username,
+        'confirmation_code': default_token_generator.make_token(user),
+    }, None)
+
+
+# Смеси сценариев с весами.
+MIXES = {
+    'read': {
+        title_list: 30, title_page: 20, title_detail: 20, review_page: 20,
+        comment_page: 10,
+    },
+    'write': {comment_post: 80, signup_token: 20},
+    'mixed': {
+        title_list: 25, title_page: 15, title_detail: 15, review_page: 15,
+        comment_page: 10, comment_post: 15, signup_token: 5,
+    },
+}
+
+
+def encode(request):
+    """Возвращает (путь со строкой запроса, тело, заголовки)."""
+    path = request.path
+    body = b''
+    headers = {'Host': 'testserver'}
+    if request.method == 'GET':
+        if request.data:
+            path += '?' + urlencode(request.data)
+    else:
+        body = json.dumps(request.data).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    headers['Content-Length'] = str(len(body))
+    if request.token:
+        headers['Authorization'] = f'Bearer {request.token}'
+    return path, body, headers
+
+
+class WSGITransport:
+    """Вызывает WSGI-приложение проекта в том же процессе."""
+
+    def __init__(self):
+        from django.core.wsgi import get_wsgi_application
+
+        self.app = get_wsgi_application()
+
+    def __call__(self, request):
+        path, body, headers = encode(request)
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for header, value in headers.items():
+            key = header.upper().replace('-', '_')
+            if key not in {'CONTENT_TYPE', 'CONTENT_LENGTH'}:
+                key = f'HTTP_{key}'
+            environ[key] = value
+        status = []
+        result = self.app(
+            environ, lambda line, *args: status.append(int(line[:3]))
+        )
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return Response(status[0], content)
+
+    def close(self):
+        pass
+
+
+class ASGITransport:
+    """
+    Вызывает ASGI-приложение проекта в цикле событий отдельного потока,
+    в который потоки нагрузки передают запросы.
+    """
+
+    def __init__(self):
+        from django.core.asgi import get_asgi_application
+
+        self.app = get_asgi_application()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True
+        )
+        self.thread.start()
+
+    async def call(self, request):
+        path, body, headers = encode(request)
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': request.method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode('utf-8'),
+            'query_string': query.encode('utf-8'),
+            'root_path': '',
+            'headers': [
+                (header.lower().encode('latin-1'), value.encode('latin-1'))
+                for header, value in headers.items()
+            ],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        messages = [{'type': 'http.request', 'body': body}]
+        status = []
+        chunks = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.app(scope, receive, send)
+        return Response(status[0], b''.join(chunks))
+
+    def __call__(self, request):
+        return asyncio.run_coroutine_threadsafe(
+            self.call(request), self.loop
+        ).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class HTTPTransport:
+    """Отправляет запросы на запущенный сервер, соединение на поток."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def __call__(self, request):
+        path, body, headers = encode(request)
+        headers['Host'] = f'{self.host}:{self.port}'
+        for attempt in range(2):
+            connection = getattr(self.local, 'connection', None)
+            if connection is None:
+                connection = self.local.connection = (
+                    http.client.HTTPConnection(self.host, self.port)
+                )
+            try:
+                connection.request(
+                    request.method, self.prefix + path, body, headers
+                )
+                response = connection.getresponse()
+                return Response(response.status, response.read())
+            except (ConnectionError, http.client.HTTPException):
+                # Сервер закрыл соединение keep-alive: одна повторная
+                # попытка с новым соединением.
+                connection.close()
+                self.local.connection = None
+                if attempt:
+                    raise
+
+    def close(self):
+        pass
+
+
+def run(transport, context, mix, requests, concurrency, seed=0):
+    """
+    Выполняет requests сценариев из смеси mix в concurrency потоков.
+    Возвращает длительность в секундах и задержки запросов по именам:
+    пары (секунды, успешен ли ответ).
+    """
+    scenarios = list(MIXES[mix])
+    weights = list(MIXES[mix].values())
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+
+    def worker(index):
+        rng = random.Random(f'{seed}-{index}')
+        samples = defaultdict(list)
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                scenario, = rng.choices(scenarios, weights)
+                steps = scenario(context, rng)
+                for request in steps:
+                    start = time.perf_counter()
+                    response = transport(request)
+                    samples[request.name].append((
+                        time.perf_counter() - start, response.status < 400
+                    ))
+                    if response.status >= 400:
+                        steps.close()
+                        break
+        finally:
+            connections.close_all()
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for samples in executor.map(worker, range(concurrency)):
+            for name, values in samples.items():
+                latencies[name].extend(values)
+    return time.perf_counter() - start, latencies
+
+
+def percentile(values, percent):
+    """Процентиль по рангу из отсортированного списка."""
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def summarize(samples, seconds):
+    durations = sorted(duration for duration, _ in samples)
+    summary = {
+        'count': len(samples),
+        'errors': sum(not ok for _, ok in samples),
+        'rps': len(samples) / seconds if seconds else 0,
+        'mean_ms': 1000 * sum(durations) / len(durations),
+    }
+    for percent in PERCENTILES:
+        summary[f'p{percent}_ms'] = 1000 * percentile(durations, percent)
+    return summary
+
+
+def make_report(seconds, latencies, meta):
+    """Результаты в виде, который сохраняется в JSON."""
+    return {
+        'meta': meta,
+        'total': summarize(
+            [sample for samples in latencies.values() for sample in samples],
+            seconds
+        ),
+        'requests': {
+            name: summarize(samples, seconds)
+            for name, samples in sorted(latencies.items())
+        },
+    }
+
+
+def compare(baseline, report, max_regression):
+    """
+    Сравнивает отчет с предыдущим. Возвращает строки сравнения
+    (имя, метрика, было, стало, изменение в процентах) и список
+    регрессий: рост p95 или падение числа запросов в секунду больше
+    чем на max_regression процентов.
+    """
+    rows = []
+    regressions = []
+    names = [('total', baseline['total'], report['total'])] + [
+        (name, baseline['requests'][name], summary)
+        for name, summary in report['requests'].items()
+        if name in baseline['requests']
+    ]
+    for name, old, new in names:
+        for metric, worse in (('p95_ms', 1), ('rps', -1)):
+            if not old[metric]:
+                continue
+            change = 100 * (new[metric] - old[metric]) / old[metric]
+            rows.append((name, metric, old[metric], new[metric], change))
+            if change * worse > max_regression:
+                regressions.append(f'{name} {metric}: {change:+.1f}%')
+    return rows, regressions
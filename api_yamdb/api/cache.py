@@ -0,0 +1,61 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Группы кэша, которые сбрасываются при изменении модели.
+MODEL_CACHE_GROUPS = {
+    'reviews.category': ('categories', 'titles'),
+    'reviews.genre': ('genres', 'titles'),
+    'reviews.title': ('titles',),
+    'reviews.titlegenre': ('titles',),
+    'reviews.review': ('titles',),
+}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(group):
+    return f'api:version:{group}'
+
+
+def get_versions(groups):
+    """Возвращает текущие версии групп кэша."""
+    cache = get_cache()
+    versions = cache.get_many([version_key(group) for group in groups])
+    return [versions.get(version_key(group), 0) for group in groups]
+
+
+def bump_version(group):
+    """
+    Увеличивает версию группы: все ключи со старой версией
+    перестают использоваться и со временем вытесняются из кэша.
+    """
+    cache = get_cache()
+    key = version_key(group)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def make_key(request, groups, vary_headers=()):
+    """
+    Ключ ответа: полный адрес запроса (со строкой параметров, которая
+    попадает и в ссылки пагинации), значения заголовков из vary_headers
+    и версии групп кэша, от которых зависят данные ответа.
+    """
+    parts = [request.build_absolute_uri()]
+    parts.extend(
+        f'{header}={request.headers.get(header, "")}'
+        for header in vary_headers
+    )
+    parts.extend(
+        f'{group}={version}'
+        for group, version in zip(groups, get_versions(groups))
+    )
+    digest = hashlib.md5('\n'.join(parts).encode('utf-8')).hexdigest()
+    return f'api:response:{digest}'
@@ -0,0 +1,38 @@
+from django.db.models import Count
+
+from reviews.models import Category, Genre, Title
+
+
+def genre_counts(title_ids):
+    return list(
+        Genre.objects.filter(title__in=title_ids).values(
+            'slug', 'name'
+        ).annotate(
+            count=Count('title', distinct=True)
+        ).order_by('-count', 'slug')
+    )
+
+
+def category_counts(title_ids):
+    return list(
+        Category.objects.filter(category__in=title_ids).values(
+            'slug', 'name'
+        ).annotate(count=Count('category')).order_by('-count', 'slug')
+    )
+
+
+def year_counts(title_ids):
+    return list(
+        Title.objects.filter(pk__in=title_ids).values('year').annotate(
+            count=Count('pk')
+        ).order_by('-year')
+    )
+
+
+# Счетчики для параметра ?facets= списка произведений. Каждый считается
+# одним запросом с GROUP BY по id произведений из отфильтрованного списка.
+TITLE_FACETS = {
+    'genre': genre_counts,
+    'category': category_counts,
+    'year': year_counts,
+}
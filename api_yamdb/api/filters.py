@@ -1,14 +1,122 @@
 import django_filters
+from django.db.models import Count
+from django_filters.constants import EMPTY_VALUES
+from rest_framework import filters
+from rest_framework.settings import api_settings
 
-from reviews.models import Title
+from reviews.autocomplete import LAST_CHAR
+from reviews.models import Title, TitleGenre
+from reviews.search import get_backend, get_tokens
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по списку значений через запятую."""
+    pass
+
+
+class TitleOrderingFilter(django_filters.OrderingFilter):
+    """
+    Сортировка `?ordering=-rating,name` с id в конце для стабильного
+    порядка страниц. Внутри одного жанра рейтинг берется из связи с жанром,
+    и выборка лучших произведений жанра идет по индексу (genre, rating).
+    """
+
+    def filter(self, queryset, value):
+        if value in EMPTY_VALUES:
+            return queryset
+        ordering = [self.get_ordering_value(param) for param in value]
+        tie_breaker = 'pk'
+        if self.parent.is_single_genre():
+            ordering = [
+                field.replace('rating', 'titlegenre__rating')
+                if field.lstrip('-') == 'rating' else field
+                for field in ordering
+            ]
+            tie_breaker = 'titlegenre__title'
+        if ordering[-1].startswith('-'):
+            tie_breaker = f'-{tie_breaker}'
+        return queryset.order_by(*ordering, tie_breaker)
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для вьюсета произведений, с полями категория, жанр, название."""
+    """
+    Фильтр для вьюсета произведений: категория, жанры через запятую
+    (`genre_match=any|all` - любой или все), точное название или его
+    начало, год или диапазон лет, а также сортировка.
+    """
+    ANY = 'any'
+    ALL = 'all'
+
     category = django_filters.CharFilter(field_name='category__slug')
-    genre = django_filters.CharFilter(field_name='genre__slug')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=((ANY, 'Any'), (ALL, 'All')), method='filter_genre_match'
+    )
     name = django_filters.CharFilter(field_name='name')
+    name_prefix = django_filters.CharFilter(method='filter_name_prefix')
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
+    )
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
+    )
+    # Объявлен последним: сортировка применяется после фильтра по жанру
+    # и использует его JOIN.
+    ordering = TitleOrderingFilter(fields=(
+        ('rating', 'rating'),
+        ('year', 'year'),
+        ('name', 'name'),
+        ('rating_count', 'review_count'),
+    ))
 
     class Meta:
         model = Title
         fields = ('name', 'genre', 'category', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Подзапрос по связям с жанрами вместо JOIN: произведение
+        не дублируется, если подходит под несколько жанров.
+        """
+        slugs = set(value)
+        if self.is_single_genre():
+            # Пара (произведение, жанр) уникальна, JOIN не дублирует строки.
+            return queryset.filter(titlegenre__genre__slug=value[0])
+        links = TitleGenre.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_match') == self.ALL:
+            links = links.values('title_id').annotate(
+                genres=Count('genre_id', distinct=True)
+            ).filter(genres=len(slugs))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def is_single_genre(self):
+        return len(set(self.form.cleaned_data.get('genre') or ())) == 1
+
+    def filter_genre_match(self, queryset, name, value):
+        """Учитывается в filter_genre."""
+        return queryset
+
+    def filter_name_prefix(self, queryset, name, value):
+        """
+        Начало названия с учетом регистра. Сравнение диапазоном, а не
+        LIKE, чтобы в SQLite использовался индекс по названию.
+        """
+        return queryset.filter(name__gte=value, name__lt=value + LAST_CHAR)
+
+
+class FullTextSearchFilter(filters.BaseFilterBackend):
+    """
+    Полнотекстовый поиск `?search=` по индексу из reviews.search,
+    результаты упорядочены по релевантности, если не задан `?ordering=`.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not get_tokens(query):
+            return queryset
+        backend = get_backend()
+        queryset = backend.filter(queryset, query)
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        return backend.rank(queryset, query)
@@ -1,11 +1,11 @@
-from django.core.mail import send_mail
+from users import outbox
 
 
 def send_mail_with_code(email, token):
-    send_mail(
+    """Ставит письмо с кодом подтверждения в очередь на отправку."""
+    outbox.enqueue(
         subject='Код подтверждения',
-        message=f'Ваш код подтверждения на регистрацию: {token}',
+        body=f'Ваш код подтверждения на регистрацию: {token}',
         from_email='from@example.com',
-        recipient_list=[email],
-        fail_silently=False,
+        recipient=email,
     )
@@ -0,0 +1,231 @@
+import json
+import platform
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from api import benchmark
+from reviews import datagen
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест API: сценарии из реальных эндпоинтов выполняются
+    в несколько потоков, для каждого запроса считаются p50/p95/p99
+    и число запросов в секунду.
+    """
+    help = (
+        'Измеряет задержки и пропускную способность API на синтетических '
+        'данных и сравнивает результаты с предыдущим запуском.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transport', default='wsgi', choices=('wsgi', 'asgi', 'http'),
+            help=(
+                'wsgi, asgi - приложение вызывается в этом процессе на '
+                'временной БД; http - запросы к серверу по --url.'
+            )
+        )
+        parser.add_argument(
+            '--url', help='Адрес сервера для --transport http.'
+        )
+        parser.add_argument(
+            '--mix', default='read', choices=tuple(benchmark.MIXES),
+            help='Смесь сценариев.'
+        )
+        parser.add_argument(
+            '--requests', default=1000, type=int,
+            help='Количество сценариев.'
+        )
+        parser.add_argument(
+            '--concurrency', default=4, type=int,
+            help='Количество параллельных клиентов.'
+        )
+        parser.add_argument(
+            '--warmup', default=50, type=int,
+            help='Количество сценариев для прогрева, не входят в отчет.'
+        )
+        parser.add_argument('--seed', default=0, type=int)
+        parser.add_argument(
+            '--skew', default=datagen.DEFAULT_SKEW, type=float,
+            help=(
+                'Неравномерность популярности произведений, как '
+                'в generate_data.'
+            )
+        )
+        for name, size in datagen.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}', default=size, type=int,
+                help=f'Размер синтетических данных, по умолчанию {size}.'
+            )
+        parser.add_argument(
+            '--db-path', type=Path,
+            help=(
+                'Файл временной БД. Если он уже есть, данные не '
+                'генерируются заново и файл не удаляется.'
+            )
+        )
+        parser.add_argument(
+            '--generate', action='store_true',
+            help=(
+                'Для --transport http: добавить синтетические данные '
+                'в БД из настроек проекта.'
+            )
+        )
+        parser.add_argument(
+            '--output', type=Path, help='Файл для результатов в JSON.'
+        )
+        parser.add_argument(
+            '--compare', type=Path,
+            help='JSON с результатами предыдущего запуска для сравнения.'
+        )
+        parser.add_argument(
+            '--max-regression', default=20, type=float,
+            help=(
+                'Допустимое ухудшение p95 и числа запросов в секунду '
+                'в процентах при --compare.'
+            )
+        )
+
+    @contextmanager
+    def temporary_database(self, db_path):
+        """
+        Тестовая БД рядом с основной: миграции применяются, как в тестах,
+        основная БД и реплики не меняются.
+        """
+        directory = None
+        keepdb = db_path is not None
+        if db_path is None:
+            directory = tempfile.mkdtemp()
+            db_path = Path(directory) / 'benchmark.sqlite3'
+        connection.settings_dict['TEST']['NAME'] = str(db_path)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb
+        )
+        # Реплики читают ту же временную БД, как зеркала в тестах.
+        for alias in settings.REPLICA_DATABASES:
+            connections[alias].creation.set_as_test_mirror(
+                connection.settings_dict
+            )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=keepdb
+            )
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def generate(self, options):
+        sizes = {name: options[name] for name in datagen.DEFAULT_SIZES}
+        counts = datagen.generate(
+            sizes, seed=options['seed'], skew=options['skew']
+        )
+        self.stdout.write(
+            'Сгенерировано: ' + ', '.join(
+                f'{name} {count}' for name, count in counts.items()
+            )
+        )
+
+    def get_transport(self, options):
+        if options['transport'] == 'http':
+            return benchmark.HTTPTransport(options['url'])
+        if options['transport'] == 'asgi':
+            return benchmark.ASGITransport()
+        return benchmark.WSGITransport()
+
+    def run_benchmark(self, options):
+        context = benchmark.BenchmarkContext()
+        if not context.reviews or not context.tokens:
+            raise CommandError(
+                'В БД нет отзывов или пользователей для сценариев.'
+            )
+        transport = self.get_transport(options)
+        try:
+            if options['warmup']:
+                benchmark.run(
+                    transport, context, options['mix'], options['warmup'],
+                    options['concurrency'], seed=-1
+                )
+            started_at = timezone.now()
+            seconds, latencies = benchmark.run(
+                transport, context, options['mix'], options['requests'],
+                options['concurrency'], seed=options['seed']
+            )
+        finally:
+            transport.close()
+        return benchmark.make_report(seconds, latencies, {
+            'transport': options['transport'],
+            'mix': options['mix'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            'started_at': started_at.isoformat(),
+            'seconds': seconds,
+            'dataset': context.counts(),
+            'database': connection.vendor,
+            'sqlite_profile': settings.SQLITE_PROFILE,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        })
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{"запрос":<14}{"всего":>8}{"ошибок":>8}{"в сек.":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        )
+        rows = list(report['requests'].items()) + [('total', report['total'])]
+        for name, summary in rows:
+            self.stdout.write(
+                f'{name:<14}{summary["count"]:>8}{summary["errors"]:>8}'
+                f'{summary["rps"]:>9.1f}{summary["p50_ms"]:>10.1f}'
+                f'{summary["p95_ms"]:>10.1f}{summary["p99_ms"]:>10.1f}'
+            )
+
+    def print_comparison(self, report, options):
+        baseline = json.loads(options['compare'].read_text())
+        rows, regressions = benchmark.compare(
+            baseline, report, options['max_regression']
+        )
+        self.stdout.write(f'\nСравнение с {options["compare"]}:')
+        for name, metric, old, new, change in rows:
+            self.stdout.write(
+                f'{name:<14}{metric:<8}{old:>10.1f}{new:>10.1f}'
+                f'{change:>+9.1f}%'
+            )
+        if regressions:
+            raise CommandError('Регрессия: ' + '; '.join(regressions))
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError(
+                '--requests и --concurrency должны быть больше нуля.'
+            )
+        if options['transport'] == 'http':
+            if not options['url']:
+                raise CommandError('Для --transport http нужен --url.')
+            if options['generate']:
+                self.generate(options)
+            report = self.run_benchmark(options)
+        else:
+            with self.temporary_database(options['db_path']):
+                if not Review.objects.exists():
+                    self.generate(options)
+                report = self.run_benchmark(options)
+        self.print_report(report)
+        if options['output']:
+            options['output'].write_text(
+                json.dumps(report, ensure_ascii=False, indent=2)
+            )
+        if options['compare']:
+            self.print_comparison(report, options)
@@ -0,0 +1,273 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Metric:
+    """Метрика Prometheus: счетчик или гистограмма с границами корзин."""
+
+    def __init__(self, name, kind, documentation, buckets=()):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.buckets = buckets
+
+
+REQUESTS = Metric(
+    'http_requests_total', 'counter', 'Количество ответов API.'
+)
+LATENCY = Metric(
+    'http_request_duration_seconds', 'histogram',
+    'Время обработки запроса.', TIME_BUCKETS
+)
+DB_QUERIES = Metric(
+    'http_request_db_queries', 'histogram',
+    'Количество запросов к БД за запрос.', QUERY_BUCKETS
+)
+DB_TIME = Metric(
+    'http_request_db_duration_seconds', 'histogram',
+    'Время запросов к БД за запрос.', TIME_BUCKETS
+)
+SERIALIZER_TIME = Metric(
+    'http_request_serializer_duration_seconds', 'histogram',
+    'Время сериализации данных ответа.', TIME_BUCKETS
+)
+RESPONSE_SIZE = Metric(
+    'http_response_size_bytes', 'histogram',
+    'Размер тела ответа.', SIZE_BUCKETS
+)
+METRICS = (
+    REQUESTS, LATENCY, DB_QUERIES, DB_TIME, SERIALIZER_TIME, RESPONSE_SIZE
+)
+
+HEADER_SIZE = 8
+
+
+def entry_offset(length):
+    """Смещение значения от начала записи: длина и ключ, кратно 8."""
+    return (4 + length + 7) // 8 * 8
+
+
+def read_entries(data, used):
+    """Записи файла: тройки (ключ, значение, смещение значения)."""
+    offset = HEADER_SIZE
+    while offset < used:
+        length, = struct.unpack_from('i', data, offset)
+        key = bytes(data[offset + 4:offset + 4 + length]).decode('utf-8')
+        position = offset + entry_offset(length)
+        value, = struct.unpack_from('d', data, position)
+        yield key, value, position
+        offset = position + 8
+
+
+class MmapValues:
+    """
+    Значения float64 по строковым ключам в файле, отображенном в память.
+    Заголовок файла - занятый размер, за ним записи: длина ключа, ключ
+    в UTF-8 и значение. Файл пишет только процесс-владелец, а размер
+    в заголовке увеличивается после записи ключа, поэтому другие процессы
+    читают только целые записи.
+    """
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = struct.unpack_from('i', self._mmap, 0)[0]
+        if self._used == 0:
+            self._used = HEADER_SIZE
+            struct.pack_into('i', self._mmap, 0, self._used)
+        self._positions = {
+            key: position
+            for key, _, position in read_entries(self._mmap, self._used)
+        }
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value, = struct.unpack_from('d', self._mmap, position)
+        struct.pack_into('d', self._mmap, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        position = self._used + entry_offset(len(encoded))
+        while position + 8 > self._capacity:
+            self._capacity *= 2
+            self._file.truncate(self._capacity)
+            self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        struct.pack_into(
+            f'i{len(encoded)}s', self._mmap, self._used, len(encoded), encoded
+        )
+        struct.pack_into('d', self._mmap, position, 0.0)
+        self._used = position + 8
+        struct.pack_into('i', self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER_SIZE:
+        return []
+    used, = struct.unpack_from('i', data, 0)
+    return [(key, value) for key, value, _ in read_entries(data, used)]
+
+
+_lock = threading.Lock()
+_store = None
+
+
+def get_values():
+    """
+    Файл значений текущего процесса в METRICS_DIR. После fork
+    дочерний процесс открывает собственный файл.
+    """
+    global _store
+    directory = Path(settings.METRICS_DIR)
+    pid = os.getpid()
+    if _store is None or _store[:2] != (pid, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        _store = (pid, directory, MmapValues(directory / f'metrics_{pid}.db'))
+    return _store[2]
+
+
+def make_key(metric, suffix, labels):
+    return json.dumps([metric.name, suffix, sorted(labels.items())])
+
+
+def format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+@lru_cache(maxsize=4096)
+def histogram_keys(metric, labels):
+    """
+    Ключи корзин, суммы и количества гистограммы для меток - кортежа
+    пар, чтобы не собирать JSON ключей при каждом наблюдении.
+    """
+    labels = dict(labels)
+    return (
+        tuple(
+            make_key(metric, '_bucket', dict(labels, le=format_bound(bound)))
+            for bound in metric.buckets + (float('inf'),)
+        ),
+        make_key(metric, '_sum', labels),
+        make_key(metric, '_count', labels),
+    )
+
+
+@lru_cache(maxsize=4096)
+def counter_key(metric, labels):
+    return make_key(metric, '', dict(labels))
+
+
+def observe(values, metric, labels, value):
+    """
+    Корзины хранятся накопленными, как в выводе: наблюдение
+    увеличивает все корзины с границей не меньше значения.
+    """
+    bucket_keys, sum_key, count_key = histogram_keys(metric, labels)
+    for key in bucket_keys[bisect.bisect_left(metric.buckets, value):]:
+        values.add(key, 1)
+    values.add(sum_key, value)
+    values.add(count_key, 1)
+
+
+def observe_request(route, method, status_code, duration, queries,
+                    serializer_duration, size):
+    """
+    Записывает метрики запроса: queries - пары (SQL, длительность),
+    size - размер ответа или None для потоковых ответов.
+    """
+    labels = (('route', route), ('method', method))
+    with _lock:
+        values = get_values()
+        values.add(counter_key(
+            REQUESTS, labels + (('status', str(status_code)),)
+        ), 1)
+        observe(values, LATENCY, labels, duration)
+        observe(values, DB_QUERIES, labels, len(queries))
+        observe(values, DB_TIME, labels, sum(time for _, time in queries))
+        observe(values, SERIALIZER_TIME, labels, serializer_duration)
+        if size is not None:
+            observe(values, RESPONSE_SIZE, labels, size)
+
+
+def add_serializer_time(request, duration):
+    """Добавляет время сериализации к запросу Django или DRF."""
+    request = getattr(request, '_request', request)
+    request.serializer_duration = (
+        getattr(request, 'serializer_duration', 0) + duration
+    )
+
+
+def collect():
+    """Суммирует значения из файлов всех процессов."""
+    totals = defaultdict(float)
+    for path in Path(settings.METRICS_DIR).glob('metrics_*.db'):
+        for key, value in read_file(path):
+            totals[key] += value
+    samples = defaultdict(list)
+    for key, value in totals.items():
+        name, suffix, labels = json.loads(key)
+        samples[name].append((suffix, labels, value))
+    return samples
+
+
+def sample_order(sample):
+    suffix, labels, _ = sample
+    labels = dict(labels)
+    bound = labels.pop('le', None)
+    return (
+        sorted(labels.items()),
+        ('_bucket', '_sum', '_count', '').index(suffix),
+        float(bound) if bound else 0
+    )
+
+
+def escape(value):
+    return (
+        value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+    )
+
+
+def render():
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    samples = collect()
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for suffix, labels, value in sorted(
+            samples.get(metric.name, ()), key=sample_order
+        ):
+            label_text = ','.join(
+                f'{name}="{escape(label)}"' for name, label
+                in sorted(labels, key=lambda item: item[0] == 'le')
+            )
+            lines.append(f'{metric.name}{suffix}{{{label_text}}} {value!r}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,77 @@
+import time
+
+from api import metrics, querybudget, slowlog
+
+
+class MetricsMiddleware:
+    """
+    Записывает метрики Prometheus для каждого запроса: время обработки,
+    количество и время запросов к БД, время сериализации и размер ответа
+    с метками имени маршрута из api/urls.py и метода.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        request.serializer_duration = 0
+        with querybudget.QueryRecorder() as recorder:
+            response = self.get_response(request)
+        match = request.resolver_match
+        metrics.observe_request(
+            match.view_name if match else 'unmatched',
+            request.method, response.status_code,
+            time.perf_counter() - start, recorder.queries,
+            request.serializer_duration,
+            None if response.streaming else len(response.content)
+        )
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает запросы к БД за время обработки запроса и сверяет их
+    с бюджетом вью (атрибут query_budget) и с порогом повторов
+    одинаковых по форме запросов (N+1). О нарушениях пишет в лог,
+    а при QUERY_BUDGET_STRICT выбрасывает исключение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with querybudget.QueryRecorder() as recorder:
+            response = self.get_response(request)
+        problems = querybudget.check_queries(recorder, request.query_budget)
+        if problems:
+            querybudget.report(request, problems)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = querybudget.get_query_budget(
+            view_func, request.method
+        )
+
+
+class SlowRequestMiddleware:
+    """
+    Сохраняет медленные запросы (дольше SLOW_REQUEST_THRESHOLD секунд)
+    и случайную выборку остальных с маршрутом, параметрами, ролью
+    пользователя и запросами к БД с длительностью и планами.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with slowlog.TraceRecorder() as recorder:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        if slowlog.should_record(duration):
+            slowlog.write(
+                slowlog.build_entry(request, response, duration, recorder)
+            )
+        return response
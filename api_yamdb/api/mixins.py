@@ -1,12 +1,324 @@
-from rest_framework import mixins, viewsets
+import calendar
+import hashlib
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api import cache, metrics, replicas
+from reviews import cascade
+
+CONDITIONAL_HEADERS = ('ETag', 'Last-Modified')
+
+
+def conditional_response(request, headers):
+    """
+    Возвращает ответ 304 (или 412), если данные у клиента не изменились
+    согласно заголовкам If-None-Match и If-Modified-Since, иначе None.
+    """
+    last_modified = headers.get('Last-Modified')
+    response = get_conditional_response(
+        request._request,
+        etag=headers.get('ETag'),
+        last_modified=(
+            calendar.timegm(last_modified.utctimetuple())
+            if last_modified else None
+        )
+    )
+    if response is not None:
+        for header, value in format_conditional_headers(headers).items():
+            response[header] = value
+    return response
+
+
+def format_conditional_headers(headers):
+    formatted = {}
+    if headers.get('ETag'):
+        formatted['ETag'] = headers['ETag']
+    if headers.get('Last-Modified'):
+        formatted['Last-Modified'] = http_date(
+            calendar.timegm(headers['Last-Modified'].utctimetuple())
+        )
+    return formatted
+
+
+class ReplicaReadMixin:
+    """
+    Миксин, направляющий чтения безопасных запросов на реплики БД
+    (REPLICA_DATABASES). После успешного изменения данных чтения
+    пользователя на время READ_YOUR_WRITES_WINDOW закрепляются за
+    основной БД, чтобы он сразу видел свой отзыв или комментарий.
+    """
+    replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS:
+            self.replica_token = replicas.read_from_replica(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.replica_token is not None:
+            replicas.reset(self.replica_token)
+            self.replica_token = None
+        elif (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < status.HTTP_400_BAD_REQUEST
+        ):
+            replicas.pin_to_primary(request.user)
+        return super().finalize_response(
+            request, response, *args, **kwargs
+        )
+
+
+class CascadeDeleteMixin:
+    """
+    Миксин, удаляющий объект внутри reviews.cascade.deletion(): после
+    каскадного удаления отзывов и комментариев рейтинг произведений
+    пересчитывается, а поисковый индекс очищается одним запросом на
+    модель, а не по запросу на строку.
+    """
+    def perform_destroy(self, instance):
+        with cascade.deletion():
+            super().perform_destroy(instance)
+
+
+class SerializerTimingMixin:
+    """
+    Миксин, учитывающий в метриках время сериализации данных ответа:
+    to_representation сериализатора верхнего уровня, с вложенными
+    сериализаторами.
+    """
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        to_representation = serializer.to_representation
+
+        def timed_to_representation(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return to_representation(*args, **kwargs)
+            finally:
+                metrics.add_serializer_time(
+                    self.request, time.perf_counter() - start
+                )
+
+        serializer.to_representation = timed_to_representation
+        return serializer
 
 
 class ListCreateDeleteMixin(
-    mixins.ListModelMixin, mixins.CreateModelMixin, mixins.DestroyModelMixin,
-    viewsets.GenericViewSet
+    SerializerTimingMixin, mixins.ListModelMixin, mixins.CreateModelMixin,
+    mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     """
     Миксин для доступа к списку, созданию и удалению данных БД.
     Для моделей Genre и Category.
     """
     pass
+
+
+class CachedListMixin:
+    """
+    Миксин, кэширующий данные ответа list.
+    В кэш попадают сериализованные данные, а не отрендеренный ответ,
+    поэтому формат ответа по-прежнему выбирается по заголовку Accept.
+    Данные публичных эндпоинтов не зависят от пользователя, поэтому
+    заголовок Authorization в ключ не входит.
+    """
+    cache_groups = ()
+    cache_vary_headers = ('Accept-Language',)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = cache.make_key(
+            request, self.cache_groups, self.cache_vary_headers
+        )
+        cached = cache.get_cache().get(key)
+        if cached is not None:
+            data, headers = cached
+            not_modified = conditional_response(request, headers)
+            if not_modified is not None:
+                return not_modified
+            return Response(data, headers=format_conditional_headers(headers))
+        # Версия группы уже изменена после записи, а реплика может еще
+        # не получить изменения: данные для кэша читаются из основной БД.
+        with replicas.use_primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.get_cache().set(
+                key,
+                (response.data, getattr(response, 'conditional_headers', {})),
+                timeout=settings.API_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedListRetrieveMixin(CachedListMixin):
+    """Миксин, кэширующий данные ответов list и retrieve."""
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalListMixin:
+    """
+    Миксин для условных GET-запросов к list.
+    ETag и Last-Modified вычисляются одним агрегатным запросом
+    (максимальная дата изменения и количество строк) по каждому набору
+    из get_etag_querysets, поэтому при совпадении с If-None-Match или
+    If-Modified-Since ответ 304 отдается без выборки и сериализации.
+    Количество строк в ETag учитывает удаления, которые не меняют
+    максимальную дату изменения.
+    """
+    def get_etag_querysets(self):
+        """Наборы данных, от которых зависит ответ."""
+        return (self.filter_queryset(self.get_queryset()),)
+
+    def get_conditional_headers(self, request, **lookup):
+        parts = [request.build_absolute_uri(), request.headers.get('Accept')]
+        last_modified = None
+        for queryset in self.get_etag_querysets():
+            if lookup:
+                queryset = queryset.filter(**lookup)
+                lookup = None
+            state = queryset.order_by().aggregate(
+                last=Max('updated_at'), count=Count('pk')
+            )
+            parts.extend((state['last'], state['count']))
+            if state['last'] and (
+                last_modified is None or state['last'] > last_modified
+            ):
+                last_modified = state['last']
+        if last_modified is None:
+            return {}
+        digest = hashlib.md5(
+            '|'.join(str(part) for part in parts).encode('utf-8')
+        ).hexdigest()
+        return {
+            'ETag': f'W/{quote_etag(digest)}',
+            'Last-Modified': last_modified,
+        }
+
+    def conditional_get(self, handler, request, lookup, *args, **kwargs):
+        headers = self.get_conditional_headers(request, **lookup)
+        not_modified = conditional_response(request, headers)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response.conditional_headers = headers
+            for header, value in format_conditional_headers(headers).items():
+                response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(
+            super().list, request, {}, *args, **kwargs
+        )
+
+
+class ConditionalListRetrieveMixin(ConditionalListMixin):
+    """Миксин для условных GET-запросов к list и retrieve."""
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.conditional_get(
+            super().retrieve, request,
+            {self.lookup_field: kwargs[lookup_url_kwarg]}, *args, **kwargs
+        )
+
+
+class FacetListMixin:
+    """
+    Миксин, добавляющий к ответу list счетчики `?facets=genre,year`
+    по отфильтрованному набору данных, без учета пагинации.
+    Для запросов без фильтров счетчики не зависят от страницы и хранятся
+    в кэше до изменения данных группы кэша facets_cache_group.
+    """
+    facets = {}
+    facets_query_param = 'facets'
+    facets_cache_group = None
+
+    def get_facet_names(self, request):
+        value = request.query_params.get(self.facets_query_param, '')
+        names = [name for name in value.split(',') if name]
+        unknown = set(names) - set(self.facets)
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param: (
+                    f'Доступные счетчики: {", ".join(self.facets)}.'
+                )
+            })
+        return names
+
+    def is_filtered(self, request):
+        not_filters = {
+            self.facets_query_param, 'format', api_settings.ORDERING_PARAM
+        }
+        if self.paginator is not None:
+            not_filters.add(self.paginator.page_query_param)
+        return bool(set(request.query_params) - not_filters)
+
+    def get_facets(self, request, names):
+        title_ids = self.filter_queryset(
+            self.get_queryset()
+        ).order_by().values('pk')
+        if self.facets_cache_group is None or self.is_filtered(request):
+            return {name: self.facets[name](title_ids) for name in names}
+        version, = cache.get_versions((self.facets_cache_group,))
+        keys = {
+            name: f'api:facets:{self.basename}:{name}:{version}'
+            for name in names
+        }
+        cached = cache.get_cache().get_many(keys.values())
+        facets = {}
+        for name, key in keys.items():
+            if key not in cached:
+                with replicas.use_primary():
+                    cached[key] = self.facets[name](title_ids)
+                cache.get_cache().set(
+                    key, cached[key], timeout=settings.API_CACHE_TIMEOUT
+                )
+            facets[name] = cached[key]
+        return facets
+
+    def list(self, request, *args, **kwargs):
+        names = self.get_facet_names(request)
+        response = super().list(request, *args, **kwargs)
+        if names and isinstance(response.data, dict):
+            response.data['facets'] = self.get_facets(request, names)
+        return response
+
+
+class NestedListMixin:
+    """
+    Миксин для вложенных эндпоинтов вида /titles/<id>/reviews/.
+    Родитель отдельно не загружается: get_queryset фильтрует объекты по id
+    из URL, поэтому страница или объект выбираются вместе с проверкой
+    родителя одним запросом. Запрос по get_parent_queryset выполняется,
+    только если страница пуста (чтобы отличить пустой список от
+    несуществующего родителя) и при создании объекта.
+    """
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def get_parent(self):
+        return get_object_or_404(self.get_parent_queryset())
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        results = response.data
+        if isinstance(results, dict):
+            results = results.get('results')
+        if not results and not self.get_parent_queryset().exists():
+            raise Http404
+        return response
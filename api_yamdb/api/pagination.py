@@ -0,0 +1,133 @@
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PubDateKeysetPagination(PageNumberPagination):
+    """
+    Пагинация для отзывов и комментариев.
+    По умолчанию работает постранично, а с параметром `?pagination=cursor`
+    или `?cursor=` переключается на курсор по паре (pub_date, id):
+    страница выбирается по составному индексу без OFFSET и COUNT(*).
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode_query_value = 'cursor'
+    ordering = ('pub_date', 'id')
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param)
+            == self.mode_query_value
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by(
+                *(f'-{field}' for field in self.ordering)
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(
+                position, reverse
+            ))
+
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+
+        self.next_position = self.previous_position = None
+        if page:
+            if has_more or reverse:
+                self.next_position = self.get_position(page[-1])
+            if (has_more and reverse) or (
+                not reverse and position is not None
+            ):
+                self.previous_position = self.get_position(page[0])
+        elif position is not None:
+            # Страница пуста: ссылка ведет обратно от той же позиции.
+            if reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+        return page
+
+    def get_position_filter(self, position, reverse):
+        """
+        Условие `(pub_date, id) > позиции` (или `<` для обхода назад).
+        Отдельное сравнение `pub_date >= позиции` позволяет SQLite начать
+        поиск по индексу сразу с нужной позиции, а не с начала списка.
+        """
+        pub_date, pk = position
+        lookup = 'lt' if reverse else 'gt'
+        return Q(**{f'pub_date__{lookup}e': pub_date}) & (
+            Q(**{f'pub_date__{lookup}': pub_date})
+            | Q(**{f'id__{lookup}': pk})
+        )
+
+    def get_position(self, instance):
+        return instance.pub_date, instance.pk
+
+    def decode_cursor(self, request):
+        """Возвращает позицию и направление обхода из параметра курсора."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, pub_date, pk = b64decode(
+                encoded.encode('ascii'), altchars=b'-_'
+            ).decode('utf-8').split('|')
+            return (
+                (datetime.fromisoformat(pub_date), int(pk)),
+                direction == 'p'
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        pub_date, pk = position
+        raw = f"{'p' if reverse else 'n'}|{pub_date.isoformat()}|{pk}"
+        return replace_query_param(
+            remove_query_param(self.base_url, self.mode_query_param),
+            self.cursor_query_param,
+            b64encode(raw.encode('utf-8'), altchars=b'-_').decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -0,0 +1,42 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+
+from api.renderers import JSONRenderer, orjson
+
+# Целые вне 64 бит orjson молча превращает во float, поэтому тела с
+# длинными числами разбирает стандартный json. Цифры заменяются на 0, а
+# остальные байты на пробел: translate и поиск подстроки в разы быстрее
+# регулярного выражения.
+DIGITS = bytes(
+    ord('0') if chr(byte).isdigit() else ord(' ') for byte in range(128)
+) + b' ' * 128
+LONG_NUMBER = b'0' * 19
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    JSONParser DRF, разбирающий тело запроса через orjson, если он
+    установлен и тело в UTF-8. Тела с числами от 19 цифр и тела, которые
+    orjson не разобрал, разбирает родитель через стандартный json:
+    результат и текст ParseError остаются прежними.
+    """
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (
+            orjson is None or not self.strict
+            or codecs.lookup(encoding).name != 'utf-8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER not in body.translate(DIGITS):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
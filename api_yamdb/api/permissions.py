@@ -1,10 +1,12 @@
 from rest_framework import permissions
 
+from api.authentication import MetricsTokenAuthentication
+
 
 class IsAuthorOrModeratorOrAdmin(permissions.BasePermission):
     """Права доступа к объекту, для автора, админа или модератора."""
     def has_object_permission(self, request, view, obj):
-        if obj.author == request.user:
+        if obj.author_id == request.user.pk:
             return True
         if (
             request.user.is_authenticated
@@ -38,3 +40,11 @@ class IsAdminUser(permissions.BasePermission):
             request.user.is_authenticated
             and (request.user.is_superuser or request.user.is_admin)
         )
+
+
+class IsAdminOrMetricsScraper(IsAdminUser):
+    """Права доступа для администратора или сборщика с METRICS_TOKEN."""
+    def has_permission(self, request, view):
+        return isinstance(
+            request.successful_authenticator, MetricsTokenAuthentication
+        ) or super().has_permission(request, view)
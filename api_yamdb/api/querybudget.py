@@ -0,0 +1,119 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+# Управление транзакциями повторяется в каждом atomic() и N+1 не считается.
+TRANSACTION_RE = re.compile(
+    r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT'
+    r'|ROLLBACK)\b',
+    re.IGNORECASE
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к API превысил бюджет запросов к БД или содержит N+1."""
+
+
+def normalize_sql(sql):
+    """
+    Форма запроса: значения (строки, числа, параметры) заменены на `?`,
+    а списки `IN (?, ?, ?)` любой длины - на `IN (...)`.
+    """
+    sql = STRING_RE.sub('?', sql).replace('%s', '?')
+    sql = IN_LIST_RE.sub('(...)', NUMBER_RE.sub('?', sql))
+    return ' '.join(sql.split())
+
+
+class QueryRecorder:
+    """
+    Записывает пары (SQL, длительность в секундах) запросов ко всем БД
+    внутри блока with. В отличие от CaptureQueriesContext работает и при
+    DEBUG = False.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(
+                sql, params, many, context, time.perf_counter() - start
+            )
+
+    def record(self, sql, params, many, context, duration):
+        self.queries.append((sql, duration))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    def repeated(self, threshold):
+        """Формы запросов, выполненные не меньше threshold раз."""
+        shapes = Counter(
+            normalize_sql(sql) for sql, _ in self.queries
+            if not TRANSACTION_RE.match(sql)
+        )
+        return [
+            (shape, count) for shape, count in shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def get_query_budget(view_func, method):
+    """
+    Бюджет из атрибута query_budget класса вью: число для всех действий
+    или словарь по действиям вьюсета (list, retrieve, create, ...)
+    и методам для APIView (get, post, ...). Для действий с несколькими
+    методами, например @action(methods=['GET', 'PATCH']), значением
+    может быть словарь по методам. None - бюджета нет.
+    """
+    budget = getattr(getattr(view_func, 'cls', None), 'query_budget', None)
+    if isinstance(budget, dict):
+        method = method.lower()
+        actions = getattr(view_func, 'actions', None) or {}
+        budget = budget.get(actions.get(method, method))
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+def check_queries(recorder, budget):
+    """Возвращает список нарушений: превышение бюджета и N+1."""
+    problems = []
+    if budget is not None and len(recorder.queries) > budget:
+        problems.append(
+            f'{len(recorder.queries)} запросов к БД при бюджете {budget}'
+        )
+    for shape, count in recorder.repeated(
+        settings.QUERY_BUDGET_REPEAT_THRESHOLD
+    ):
+        problems.append(f'N+1: {count} раз `{shape}`')
+    return problems
+
+
+def report(request, problems):
+    message = f'{request.method} {request.path}: ' + '; '.join(problems)
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
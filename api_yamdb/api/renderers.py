@@ -0,0 +1,54 @@
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+if orjson is not None:
+    # Даты и dataclass orjson кодирует иначе, чем JSONEncoder DRF, или не
+    # кодирует вовсе, поэтому они передаются в его default.
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer DRF, кодирующий ответы через orjson, если он установлен.
+    Вывод совпадает с родителем байт в байт: компактные разделители,
+    UTF-8 без экранирования, экранированные U+2028 и U+2029.
+
+    Отступы (`?format=json; indent=4`, Browsable API), настройки
+    UNICODE_JSON, COMPACT_JSON и STRICT_JSON, отличные от значений по
+    умолчанию, и данные, которые orjson не кодирует (целые больше 64 бит,
+    нестроковые ключи), обрабатывает родитель через стандартный json.
+    Отличие одно: float меньше 1e-4 или от 1e16 orjson записывает без
+    экспоненты или с короткой экспонентой, а NaN - как null; в API
+    дробные числа - только рейтинги от 1 до 10.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii
+            or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и родитель, экранирует разделители строк, недопустимые в
+        # строковых литералах JavaScript.
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+            PARAGRAPH_SEPARATOR, b'\\u2029'
+        )
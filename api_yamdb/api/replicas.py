@@ -0,0 +1,85 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, из которой читает текущий запрос; None - основная БД.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def pin_key(user_id):
+    return f'replicas:pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """
+    После записи пользователя его чтения READ_YOUR_WRITES_WINDOW секунд
+    идут в основную БД, пока изменения доходят до реплик.
+    """
+    if settings.REPLICA_DATABASES and user.is_authenticated:
+        get_cache().set(
+            pin_key(user.pk), True, settings.READ_YOUR_WRITES_WINDOW
+        )
+
+
+def is_pinned(user):
+    return user.is_authenticated and get_cache().get(
+        pin_key(user.pk)
+    ) is not None
+
+
+def read_from_replica(user):
+    """
+    Направляет чтения текущего запроса на случайную реплику, если они
+    есть и пользователь недавно ничего не менял. Возвращает токен для
+    reset или None, если чтения остаются в основной БД.
+    """
+    if not settings.REPLICA_DATABASES or is_pinned(user):
+        return None
+    return _read_alias.set(random.choice(settings.REPLICA_DATABASES))
+
+
+def reset(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Чтения внутри блока идут в основную БД."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри read_from_replica идут в выбранную реплику, остальные
+    чтения и все записи - в основную БД. Реплики - копии основной БД,
+    миграции к ним не применяются.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -1,11 +1,9 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from reviews.models import (
-    Category, Comment, Genre, Review, Title, TitleGenre
+    Category, Comment, Genre, Review, Title
 )
 from users import validators
 
@@ -77,12 +75,38 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
 
+class SlugListField(serializers.ManyRelatedField):
+    """
+    Список slug связанных объектов. В отличие от SlugRelatedField
+    с many=True, все объекты выбираются одним запросом к БД.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        relation = self.child_relation
+        try:
+            objects = relation.get_queryset().in_bulk(
+                data, field_name=relation.slug_field
+            )
+        except (TypeError, ValueError):
+            relation.fail('invalid')
+        for slug in data:
+            if slug not in objects:
+                relation.fail(
+                    'does_not_exist', slug_name=relation.slug_field,
+                    value=slug
+                )
+        return [objects[slug] for slug in data]
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для Title для не безопасных запросов."""
-    rating = serializers.SerializerMethodField()
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(), slug_field='slug', many=True
-    )
+    rating = serializers.FloatField(read_only=True)
+    genre = SlugListField(child_relation=serializers.SlugRelatedField(
+        queryset=Genre.objects.all(), slug_field='slug'
+    ))
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(), slug_field='slug'
     )
@@ -93,23 +117,10 @@ class TitleSerializer(serializers.ModelSerializer):
             'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
         )
 
-    def get_rating(self, obj):
-        """Расчет средней оценки произведения"""
-        review = Review.objects.filter(
-            title_id=obj.id
-        ).aggregate(res=Avg('score'))
-        return review.get('res')
-
     def create(self, validated_data):
-        genre_list = validated_data.pop('genre')
-        category_name = validated_data.pop('category')
-        current_category = get_object_or_404(Category, name=category_name)
-        title = Title.objects.create(
-            category=current_category, **validated_data
-        )
-        for genre_dict in genre_list:
-            current_genre = get_object_or_404(Genre, name=genre_dict)
-            TitleGenre.objects.create(title=title, genre=current_genre)
+        genres = validated_data.pop('genre')
+        title = Title.objects.create(**validated_data)
+        title.genre.add(*genres)
         return title
 
 
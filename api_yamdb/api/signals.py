@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save
+)
+from django.dispatch import receiver
+
+from api import cache
+
+# Связи с жанрами удаляются каскадом вместе с жанром или произведением,
+# которые сами сбрасывают кэш, или через Title.genre, о чем сообщает
+# m2m_changed. Без получателей post_delete Django удаляет связи одним
+# DELETE, не загружая каждую строку.
+M2M_THROUGH_MODELS = ('reviews.titlegenre',)
+
+
+def invalidate_api_cache(sender, **kwargs):
+    """
+    Сбрасывает кэш ответов, зависящих от измененной модели.
+    Версия меняется после фиксации транзакции, чтобы параллельный запрос
+    не закэшировал под новой версией еще не зафиксированные данные.
+    Подключен только к моделям из MODEL_CACHE_GROUPS: у остальных моделей
+    сигналы удаления без получателей и каскадное удаление остается быстрым.
+    """
+    if kwargs.get('action', '').startswith('pre_'):
+        return
+    for group in cache.MODEL_CACHE_GROUPS.get(sender._meta.label_lower, ()):
+        transaction.on_commit(lambda group=group: cache.bump_version(group))
+
+
+for label in cache.MODEL_CACHE_GROUPS:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_api_cache, sender=model)
+    if label in M2M_THROUGH_MODELS:
+        m2m_changed.connect(invalidate_api_cache, sender=model)
+    else:
+        post_delete.connect(invalidate_api_cache, sender=model)
+
+
+@receiver(post_migrate)
+def clear_api_cache(sender, **kwargs):
+    """После миграций и очистки БД (flush) кэш ответов больше не актуален."""
+    cache.get_cache().clear()
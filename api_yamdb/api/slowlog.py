@@ -0,0 +1,153 @@
+import json
+import os
+import random
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from api.querybudget import QueryRecorder, normalize_sql
+
+_lock = threading.Lock()
+
+
+class TraceRecorder(QueryRecorder):
+    """QueryRecorder, который сохраняет еще параметры и псевдоним БД."""
+
+    def __init__(self):
+        super().__init__()
+        self.trace = []
+
+    def record(self, sql, params, many, context, duration):
+        super().record(sql, params, many, context, duration)
+        self.trace.append((
+            sql, None if many else params, duration,
+            context['connection'].alias
+        ))
+
+
+def should_record(duration):
+    """Запрос медленный или попал в случайную выборку."""
+    return (
+        duration >= settings.SLOW_REQUEST_THRESHOLD
+        or random.random() < settings.SLOW_REQUEST_SAMPLE_RATE
+    )
+
+
+def explain(alias, sql, params):
+    """План запроса SELECT или None для остальных запросов."""
+    if params is None or not sql.lstrip().upper().startswith(
+        ('SELECT', 'WITH')
+    ):
+        return None
+    connection = connections[alias]
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite'
+        else 'EXPLAIN '
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'Ошибка: {error}'
+
+
+def trace_queries(trace):
+    """
+    Запросы в порядке выполнения, не больше SLOW_REQUEST_MAX_QUERIES.
+    План строится один раз для каждой формы запроса, поэтому N+1
+    не умножает число EXPLAIN. Параметры запросов сохраняются только
+    при SLOW_REQUEST_LOG_PARAMS: в них бывают почта и хэши паролей.
+    """
+    keep_params = settings.SLOW_REQUEST_LOG_PARAMS
+    plans = {}
+    queries = []
+    for sql, params, duration, alias in (
+        trace[:settings.SLOW_REQUEST_MAX_QUERIES]
+    ):
+        shape = (alias, normalize_sql(sql))
+        if shape not in plans:
+            plans[shape] = explain(alias, sql, params)
+        queries.append({
+            'sql': sql,
+            'params': [
+                str(param) for param in params
+            ] if keep_params and params is not None else None,
+            'duration': duration,
+            'database': alias,
+            'plan': plans[shape],
+        })
+    return queries
+
+
+def build_entry(request, response, duration, recorder):
+    match = request.resolver_match
+    user = getattr(request, 'user', None)
+    return {
+        'id': uuid.uuid4().hex,
+        'time': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'route': match.view_name if match else None,
+        'params': dict(request.GET.lists()),
+        'role': (
+            getattr(user, 'role', None)
+            if user is not None and user.is_authenticated else 'anonymous'
+        ),
+        'status': response.status_code,
+        'duration': duration,
+        'query_count': len(recorder.trace),
+        'db_duration': sum(query[2] for query in recorder.trace),
+        'queries': trace_queries(recorder.trace),
+    }
+
+
+def write(entry):
+    """
+    Дописывает запись в файл SLOW_REQUEST_LOG. Когда файл превышает
+    SLOW_REQUEST_LOG_MAX_BYTES, он становится резервной копией `.1`,
+    а прежняя копия удаляется. Новый файл доступен только владельцу.
+    """
+    path = os.fspath(settings.SLOW_REQUEST_LOG)
+    line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+    with _lock:
+        try:
+            if os.path.getsize(path) >= settings.SLOW_REQUEST_LOG_MAX_BYTES:
+                os.replace(path, path + '.1')
+        except FileNotFoundError:
+            pass
+        descriptor = os.open(
+            path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+        )
+        with open(descriptor, 'a', encoding='utf-8') as file:
+            file.write(line)
+
+
+def read_entries():
+    """Записи из файла и резервной копии, новые первыми."""
+    path = os.fspath(settings.SLOW_REQUEST_LOG)
+    entries = []
+    for file_path in (path + '.1', path):
+        try:
+            with open(file_path, encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            continue
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Строка, которую другой процесс еще дописывает.
+                continue
+    entries.reverse()
+    return entries
+
+
+def get_entry(entry_id):
+    for entry in read_entries():
+        if entry['id'] == entry_id:
+            return entry
+    return None
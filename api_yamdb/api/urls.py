@@ -3,8 +3,8 @@ from rest_framework import routers
 
 from api.views import (
     AuthSignupViewSet, AuthTokenViewSet, CategoryViewSet,
-    CommentViewSet, GenreViewSet, ReviewViewSet, TitleViewSet,
-    UserViewSet
+    CommentViewSet, ExportViewSet, GenreViewSet, ReviewViewSet, SearchViewSet,
+    TitleViewSet, UserViewSet
 )
 
 app_name = 'api'
@@ -25,4 +25,6 @@ urlpatterns = [
     path('', include(router.urls)),
     path('auth/signup/', AuthSignupViewSet.as_view(), name='siginup'),
     path('auth/token/', AuthTokenViewSet.as_view(), name='token'),
+    path('export/<str:table>/', ExportViewSet.as_view(), name='export'),
+    path('search/', SearchViewSet.as_view(), name='search'),
 ]
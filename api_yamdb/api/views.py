@@ -1,16 +1,27 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from django.db.utils import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import filters, permissions, status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 
-from api import func, mixins
-from api.filters import TitleFilter
+from api import func, metrics, mixins
+from api.authentication import (
+    ClaimsAccessToken, MetricsTokenAuthentication
+)
+from api.facets import TITLE_FACETS
+from api.filters import FullTextSearchFilter, TitleFilter
+from api.pagination import PubDateKeysetPagination
 from api.permissions import (
-    IsAuthorOrModeratorOrAdmin, IsAdminUser, IsAdminOrReadOnly
+    IsAuthorOrModeratorOrAdmin, IsAdminOrMetricsScraper, IsAdminUser,
+    IsAdminOrReadOnly
 )
 from api.serializers import (
     AuthSingnupSerializer, AuthTokenSerializer,
@@ -18,11 +29,15 @@ from api.serializers import (
     ReviewSerializer, TitleSerializer, TitleForListRetrieveSerializer,
     User, UserMeSerializer, UserSerializer
 )
+from reviews import csv_export, csv_import
+from reviews.autocomplete import title_index
+from reviews.search import get_backend, get_tokens
 from reviews.models import Category, Comment, Genre, Review, Title
 
 
 class AuthSignupViewSet(views.APIView):
     """Эндпоинт для регистрации пользователя."""
+    query_budget = {'post': 7}
     permission_classes = (permissions.AllowAny,)
 
     def post(self, request):
@@ -30,22 +45,29 @@ class AuthSignupViewSet(views.APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         email = serializer.validated_data.get('email')
+        # Пользователь ищется до транзакции: транзакция SQLite, которая
+        # начинается с чтения, не может получить блокировку на запись при
+        # параллельной регистрации и сразу падает с database is locked.
+        user = User.objects.filter(username=username, email=email).first()
         try:
-            user, _ = User.objects.get_or_create(
-                username=username, email=email
-            )
+            # Пользователь и письмо с кодом сохраняются в одной транзакции,
+            # само письмо отправляет команда send_queued_emails.
+            with transaction.atomic():
+                if user is None:
+                    user = User.objects.create(username=username, email=email)
+                token = default_token_generator.make_token(user)
+                func.send_mail_with_code(email, token)
         except IntegrityError:
             return Response(
                 'Данный email или username занят',
                 status=status.HTTP_400_BAD_REQUEST
             )
-        token = default_token_generator.make_token(user)
-        func.send_mail_with_code(email, token)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class AuthTokenViewSet(views.APIView):
     """Эндпоинт для получения токена."""
+    query_budget = {'post': 1}
     permission_classes = (permissions.AllowAny,)
 
     def post(self, request):
@@ -55,7 +77,7 @@ class AuthTokenViewSet(views.APIView):
         confirmation_code = serializer.validated_data.get('confirmation_code')
         user = get_object_or_404(User, username=username)
         if default_token_generator.check_token(user, confirmation_code):
-            token = AccessToken.for_user(user)
+            token = ClaimsAccessToken.for_user(user)
             return Response(
                 {'token': str(token)}, status=status.HTTP_201_CREATED
             )
@@ -64,8 +86,16 @@ class AuthTokenViewSet(views.APIView):
         )
 
 
-class CategoryViewSet(mixins.ListCreateDeleteMixin):
+class CategoryViewSet(
+    mixins.ReplicaReadMixin, mixins.CachedListMixin,
+    mixins.ConditionalListMixin, mixins.CascadeDeleteMixin,
+    mixins.ListCreateDeleteMixin
+):
     """Эндпоинт для работы с объектами модели Category."""
+    # Каскадное удаление произведений: число запросов не зависит от
+    # числа произведений, отзывов и комментариев, см. CascadeDeleteMixin.
+    query_budget = {'list': 4, 'create': 4, 'destroy': 14}
+    cache_groups = ('categories',)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -74,10 +104,20 @@ class CategoryViewSet(mixins.ListCreateDeleteMixin):
     search_fields = ('name',)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    mixins.ReplicaReadMixin, mixins.ConditionalListRetrieveMixin,
+    mixins.NestedListMixin, mixins.SerializerTimingMixin,
+    viewsets.ModelViewSet
+):
     """Эндпоинт для работы с объектами модели Comment."""
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 5, 'partial_update': 4,
+        'destroy': 5
+    }
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = PubDateKeysetPagination
+    filter_backends = (FullTextSearchFilter,)
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdmin
@@ -89,21 +129,69 @@ class CommentViewSet(viewsets.ModelViewSet):
             return (permissions.IsAuthenticatedOrReadOnly(),)
         return super().get_permissions()
 
-    def get_review(self):
-        """Получает объект модели Review по id или выдает ошибку."""
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    def get_parent_queryset(self):
+        """Отзыв из URL, если он относится к произведению из URL."""
+        return Review.objects.filter(
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id')
+        )
 
     def get_queryset(self):
-        return Comment.objects.filter(review=self.get_review())
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
     def perform_create(self, serializer):
         return serializer.save(
-            author=self.request.user, review=self.get_review()
+            author=self.request.user, review=self.get_parent()
         )
 
 
-class GenreViewSet(mixins.ListCreateDeleteMixin):
+class ExportViewSet(views.APIView):
+    """
+    Эндпоинт для потоковой выгрузки таблицы в CSV или NDJSON.
+    Параметры: `?output=csv|ndjson`, `?gzip=1` для сжатия.
+    """
+    permission_classes = (IsAdminUser,)
+    # Строки выгружаются уже после ответа, при чтении потока.
+    query_budget = {'get': 1}
+
+    def get(self, request, table):
+        try:
+            table = csv_import.get_table(table)
+        except csv_import.CsvImportError as error:
+            raise NotFound(error)
+        output_format = request.query_params.get('output', csv_export.CSV)
+        if output_format not in csv_export.FORMATS:
+            raise ValidationError({
+                'output': (
+                    f'Доступные форматы: {", ".join(csv_export.FORMATS)}.'
+                )
+            })
+        chunks = csv_export.iter_export(table, output_format)
+        file_name = f'{table.name}.{output_format}'
+        content_type = (
+            f'{csv_export.CONTENT_TYPES[output_format]}; charset=utf-8'
+        )
+        if request.query_params.get('gzip') in {'1', 'true'}:
+            chunks = csv_export.gzip_chunks(chunks)
+            file_name += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{file_name}"'
+        )
+        return response
+
+
+class GenreViewSet(
+    mixins.ReplicaReadMixin, mixins.CachedListMixin,
+    mixins.ConditionalListMixin, mixins.ListCreateDeleteMixin
+):
     """Эндпоинт для работы с объектами модели Genre."""
+    query_budget = {'list': 4, 'create': 4, 'destroy': 6}
+    cache_groups = ('genres',)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -112,10 +200,38 @@ class GenreViewSet(mixins.ListCreateDeleteMixin):
     search_fields = ('name',)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class MetricsViewSet(views.APIView):
+    """
+    Эндпоинт метрик всех процессов в текстовом формате Prometheus.
+    Доступен администратору и сборщику с токеном METRICS_TOKEN.
+    """
+    authentication_classes = (
+        MetricsTokenAuthentication,
+        *api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    )
+    permission_classes = (IsAdminOrMetricsScraper,)
+    query_budget = {'get': 1}
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(), content_type=metrics.CONTENT_TYPE
+        )
+
+
+class ReviewViewSet(
+    mixins.ReplicaReadMixin, mixins.ConditionalListRetrieveMixin,
+    mixins.NestedListMixin, mixins.CascadeDeleteMixin,
+    mixins.SerializerTimingMixin, viewsets.ModelViewSet
+):
     """Эндпоинт для работы с объектами модели Review."""
+    query_budget = {
+        'list': 4, 'retrieve': 3, 'create': 7, 'partial_update': 7,
+        'destroy': 9
+    }
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    pagination_class = PubDateKeysetPagination
+    filter_backends = (FullTextSearchFilter,)
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdmin
@@ -127,16 +243,17 @@ class ReviewViewSet(viewsets.ModelViewSet):
             return (permissions.IsAuthenticatedOrReadOnly(),)
         return super().get_permissions()
 
-    def get_title(self):
-        """Получает объект модели Title по id или выдает ошибку."""
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+    def get_parent_queryset(self):
+        return Title.objects.filter(pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.get_title())
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
     def perform_create(self, serializer):
         return serializer.save(
-            author=self.request.user, title=self.get_title()
+            author=self.request.user, title=self.get_parent()
         )
 
     def create(self, request, *args, **kwargs):
@@ -149,11 +266,105 @@ class ReviewViewSet(viewsets.ModelViewSet):
             )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class SearchViewSet(views.APIView):
+    """
+    Эндпоинт для поиска по произведениям, отзывам и комментариям сразу.
+    Параметры: `?search=` - строка поиска, `?limit=` - число результатов.
+    Результаты упорядочены по релевантности.
+    """
+    permission_classes = (permissions.AllowAny,)
+    # Поиск по индексу и выборка найденных объектов по типам.
+    query_budget = {'get': 5}
+    default_limit = 20
+    max_limit = 100
+    search_types = {
+        'title': (
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ),
+            TitleForListRetrieveSerializer
+        ),
+        'review': (Review.objects.select_related('author'), ReviewSerializer),
+        'comment': (
+            Comment.objects.select_related('author', 'review'),
+            CommentSerializer
+        ),
+    }
+
+    def get_limit(self):
+        try:
+            limit = int(
+                self.request.query_params.get('limit', self.default_limit)
+            )
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            raise ValidationError({
+                'limit': f'Укажите число от 1 до {self.max_limit}.'
+            })
+        return limit
+
+    def get_url(self, search_type, obj):
+        if search_type == 'title':
+            kwargs = {'pk': obj.pk}
+        elif search_type == 'review':
+            kwargs = {'title_id': obj.title_id, 'pk': obj.pk}
+        else:
+            kwargs = {
+                'title_id': obj.review.title_id, 'review_id': obj.review_id,
+                'pk': obj.pk
+            }
+        return self.request.build_absolute_uri(
+            reverse(f'api:{search_type}-detail', kwargs=kwargs)
+        )
+
+    def get(self, request):
+        query = request.query_params.get('search', '')
+        limit = self.get_limit()
+        hits = get_backend().search(query, limit) if get_tokens(query) else []
+        objects = {
+            search_type: queryset.in_bulk(
+                [pk for hit_type, pk in hits if hit_type == search_type]
+            )
+            for search_type, (queryset, _) in self.search_types.items()
+        }
+        results = []
+        for search_type, pk in hits:
+            obj = objects[search_type].get(pk)
+            if obj is None:
+                continue
+            serializer_class = self.search_types[search_type][1]
+            results.append({
+                'type': search_type,
+                'url': self.get_url(search_type, obj),
+                'data': serializer_class(
+                    obj, context={'request': request}
+                ).data,
+            })
+        return Response({'count': len(results), 'results': results})
+
+
+class TitleViewSet(
+    mixins.ReplicaReadMixin, mixins.CachedListRetrieveMixin,
+    mixins.ConditionalListRetrieveMixin, mixins.FacetListMixin,
+    mixins.CascadeDeleteMixin, mixins.SerializerTimingMixin,
+    viewsets.ModelViewSet
+):
     """Эндпоинт для работы с объектами модели Title."""
-    queryset = Title.objects.all()
+    # В list входят запросы счетчиков ?facets=, в destroy - каскадное
+    # удаление отзывов и комментариев.
+    query_budget = {
+        'list': 9, 'retrieve': 6, 'autocomplete': 1, 'create': 10,
+        'partial_update': 14, 'destroy': 13
+    }
+    cache_groups = ('titles', 'categories', 'genres')
+    facets = TITLE_FACETS
+    facets_cache_group = 'titles'
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('id')
     serializer_class = TitleSerializer
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
     http_method_names = ['get', 'head', 'options', 'post', 'patch', 'delete']
 
@@ -163,13 +374,59 @@ class TitleViewSet(viewsets.ModelViewSet):
         return super().get_serializer_class()
 
     def get_permissions(self):
-        if self.action in {'list', 'retrieve'}:
+        if self.action in {'list', 'retrieve', 'autocomplete'}:
             return super().get_permissions()
         return (IsAdminUser(),)
 
+    @action(detail=False, methods=['GET'], url_path='autocomplete')
+    def autocomplete(self, request):
+        """
+        Подсказки по началу слова в названии: `?q=` - префикс,
+        `?limit=` - количество подсказок. Ответ строится по индексу
+        в памяти процесса, без запросов к БД.
+        """
+        try:
+            limit = int(request.query_params.get(
+                'limit', settings.AUTOCOMPLETE_DEFAULT_LIMIT
+            ))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= settings.AUTOCOMPLETE_MAX_LIMIT:
+            raise ValidationError({
+                'limit': (
+                    'Укажите число от 1 до '
+                    f'{settings.AUTOCOMPLETE_MAX_LIMIT}.'
+                )
+            })
+        rows = title_index.lookup(request.query_params.get('q', ''), limit)
+        return Response([
+            {
+                'id': title_id,
+                'name': name,
+                'year': year,
+                'rating': rating_sum / rating_count if rating_count else None,
+            }
+            for title_id, name, year, rating_sum, rating_count in rows
+        ])
+
+    def get_etag_querysets(self):
+        """Ответ включает вложенные категории и жанры произведений."""
+        return super().get_etag_querysets() + (
+            Category.objects.all(), Genre.objects.all()
+        )
+
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    mixins.CascadeDeleteMixin, mixins.SerializerTimingMixin,
+    viewsets.ModelViewSet
+):
     """Эндпоинт для работы с объектами модели User."""
+    # В destroy входит каскадное удаление отзывов, комментариев, групп,
+    # прав и записей журнала админки.
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 4, 'partial_update': 6,
+        'destroy': 18, 'user_me': {'get': 3, 'patch': 7}
+    }
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdminUser,)
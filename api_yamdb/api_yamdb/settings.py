@@ -1,3 +1,5 @@
+import os
+import tempfile
 from datetime import timedelta
 
 from pathlib import Path
@@ -37,18 +39,113 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+
+    # JSON кодируется и разбирается через orjson, если он установлен.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
 }
 
+API_CACHE_ALIAS = 'api'
+
+API_CACHE_TIMEOUT = 300
+
+# Сколько секунд версия токена пользователя хранится в кэше API. При
+# локальном кэше в нескольких процессах это верхняя граница времени, в
+# течение которого старый токен еще принимается после смены роли.
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+
+# Бэкенд полнотекстового поиска: индекс SQLite FTS5 или, для других БД,
+# reviews.search.DatabaseSearchBackend без индекса.
+SEARCH_BACKEND = os.getenv(
+    'SEARCH_BACKEND', 'reviews.search.SqliteSearchBackend'
+)
+
+# Индекс автодополнения названий хранится в памяти каждого процесса и
+# перестраивается из БД не реже, чем раз в AUTOCOMPLETE_MAX_AGE секунд.
+AUTOCOMPLETE_MAX_AGE = 300
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Бюджет запросов к БД задается атрибутом query_budget вьюсетов. При его
+# превышении или при повторе одного и того же по форме запроса
+# QUERY_BUDGET_REPEAT_THRESHOLD раз (N+1) в лог api.querybudget пишется
+# предупреждение, а при QUERY_BUDGET_STRICT (включается в тестах)
+# запрос завершается ошибкой.
+QUERY_BUDGET_STRICT = False
+
+QUERY_BUDGET_REPEAT_THRESHOLD = 3
+
+# Метрики Prometheus (эндпоинт /metrics): каждый процесс пишет значения
+# в свой файл в METRICS_DIR, эндпоинт суммирует файлы всех процессов.
+# Директорию нужно очищать перед запуском сервера. Эндпоинт доступен
+# администратору и сборщику с заголовком `Authorization: Bearer
+# <METRICS_TOKEN>`; пустой METRICS_TOKEN отключает доступ по токену.
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'api_yamdb_metrics')
+)
+
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Запросы дольше SLOW_REQUEST_THRESHOLD секунд и случайная доля
+# SLOW_REQUEST_SAMPLE_RATE остальных сохраняются с запросами к БД и их
+# планами в SLOW_REQUEST_LOG (JSON Lines) для просмотра в админке. При
+# превышении SLOW_REQUEST_LOG_MAX_BYTES файл переименовывается в `.1`.
+# Файл создается с правами 0600. Параметры SQL-запросов (почта, хэши
+# паролей, текст писем) сохраняются, только если SLOW_REQUEST_LOG_PARAMS.
+SLOW_REQUEST_THRESHOLD = float(os.getenv('SLOW_REQUEST_THRESHOLD', 1))
+
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv('SLOW_REQUEST_SAMPLE_RATE', 0))
+
+SLOW_REQUEST_LOG = os.getenv(
+    'SLOW_REQUEST_LOG',
+    os.path.join(BASE_DIR, 'slow_requests.jsonl')
+)
+
+SLOW_REQUEST_LOG_PARAMS = os.getenv('SLOW_REQUEST_LOG_PARAMS') == '1'
+
+SLOW_REQUEST_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_REQUEST_MAX_QUERIES = 200
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кэш ответов публичных эндпоинтов. Для нескольких процессов на одном
+    # сервере можно указать django.core.cache.backends.filebased.FileBasedCache
+    # и директорию в LOCATION, для отключения - DummyCache.
+    API_CACHE_ALIAS: {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api-responses'),
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
 }
 
 MIDDLEWARE = [
+    'api.middleware.SlowRequestMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,13 +179,67 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# Профиль SQLite выбирается переменной окружения SQLITE_PROFILE.
+# development - настройки SQLite по умолчанию и новое соединение на каждый
+# запрос. production - WAL (читатели не ждут писателя), synchronous=NORMAL
+# (в режиме WAL не теряет целостность при сбое), ожидание блокировки
+# вместо ошибки `database is locked`, кэш страниц и отображение файла
+# в память, временные таблицы в памяти, транзакции BEGIN IMMEDIATE
+# и постоянные соединения. PRAGMAS выполняются для каждого нового
+# соединения, см. api_yamdb/sqlite3/base.py.
+SQLITE_PROFILES = {
+    'development': {
+        'PRAGMAS': {},
+        'CONN_MAX_AGE': 0,
+    },
+    'production': {
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'mmap_size': 256 * 1024 * 1024,
+            # Отрицательное значение - размер в килобайтах.
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'TRANSACTION_MODE': 'IMMEDIATE',
+        'CONN_MAX_AGE': 600,
+    },
+}
+
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'development')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'api_yamdb.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
+# Реплики для чтения: пути к копиям файла БД через запятую. Копии
+# обновляются вне приложения (репликация файла SQLite или резервное
+# копирование основной БД). Безопасные запросы к произведениям,
+# категориям, жанрам, отзывам и комментариям читают из случайной
+# реплики, записи идут в основную БД. После записи чтения пользователя
+# READ_YOUR_WRITES_WINDOW секунд идут в основную БД. Метки записи
+# хранятся в кэше API, для нескольких процессов он должен быть общим.
+REPLICA_DATABASES = []
+
+for number, path in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+READ_YOUR_WRITES_WINDOW = 5
+
 
 # Password validation
 
@@ -0,0 +1,22 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд SQLite с настройками соединения из DATABASES:
+    PRAGMAS выполняются для каждого нового соединения, а транзакции
+    начинаются с `BEGIN <TRANSACTION_MODE>`. При IMMEDIATE транзакция
+    сразу берет блокировку записи и ждет ее busy_timeout: у отложенной
+    транзакции, которая сначала читает, а потом пишет (get_or_create),
+    SQLite при занятой БД сразу возвращает `database is locked`.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
@@ -2,7 +2,19 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.admin import slow_request_detail, slow_request_list
+from api.views import MetricsViewSet
+
 urlpatterns = [
+    path(
+        'admin/slow-requests/', admin.site.admin_view(slow_request_list),
+        name='slow-request-list'
+    ),
+    path(
+        'admin/slow-requests/<str:entry_id>/',
+        admin.site.admin_view(slow_request_detail),
+        name='slow-request-detail'
+    ),
     path('admin/', admin.site.urls),
     path(
         'redoc/',
@@ -10,4 +22,5 @@ urlpatterns = [
         name='redoc'
     ),
     path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics', MetricsViewSet.as_view(), name='metrics'),
 ]
@@ -5,6 +5,7 @@ from reviews import models
 admin.site.register(models.Category)
 admin.site.register(models.Comment)
 admin.site.register(models.Genre)
+admin.site.register(models.ImportCheckpoint)
 admin.site.register(models.Review)
 admin.site.register(models.Title)
 
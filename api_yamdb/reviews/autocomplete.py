@@ -0,0 +1,182 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import router
+
+from reviews.models import Title
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Нижний регистр, ё как е, слова через один пробел, без пунктуации."""
+    return ' '.join(WORD_RE.findall(text.lower().replace('ё', 'е')))
+
+
+# Символ больше любого символа в названии: ключи с префиксом p лежат
+# в массиве между (p,) и (p + LAST_CHAR,).
+LAST_CHAR = chr(0x10FFFF)
+
+# Сколько префиксов с готовыми подсказками хранить между изменениями.
+RESULTS_CACHE_SIZE = 1024
+
+
+def rank_key(title):
+    """
+    Сначала произведения с большим рейтингом, при равном рейтинге -
+    с большим числом отзывов; произведения без оценок в конце.
+    """
+    name, _, rating_sum, rating_count = title
+    rating = rating_sum / rating_count if rating_count else 0
+    return (not rating_count, -rating, -rating_count, name)
+
+
+class TitlePrefixIndex:
+    """
+    Префиксный индекс названий произведений в памяти процесса.
+    Для каждого слова названия в отсортированный массив попадает ключ -
+    нормализованное название, начиная с этого слова, поэтому все названия
+    со словом на заданный префикс находятся двоичным поиском.
+
+    Индекс строится при первом поиске, обновляется сигналами после фиксации
+    транзакций и перестраивается целиком раз в AUTOCOMPLETE_MAX_AGE секунд,
+    чтобы подхватить изменения из других процессов и массовой загрузки.
+    Короткому префиксу соответствуют тысячи ключей, поэтому готовые
+    подсказки для префикса запоминаются до следующего изменения индекса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = None
+        self._titles = {}
+        self._ranks = {}
+        self._results = {}
+        self._built_at = 0
+
+    @staticmethod
+    def make_keys(title_id, name):
+        normalized = normalize(name)
+        return [
+            (normalized[match.start():], title_id)
+            for match in WORD_RE.finditer(normalized)
+        ]
+
+    def _build(self):
+        # Индекс живет дольше запроса, поэтому строится из основной БД,
+        # а не из реплики, которая может отставать.
+        self._titles = {
+            title_id: (name, year, rating_sum, rating_count)
+            for title_id, name, year, rating_sum, rating_count
+            in Title.objects.using(router.db_for_write(Title)).values_list(
+                'id', 'name', 'year', 'rating_sum', 'rating_count'
+            ).iterator()
+        }
+        self._ranks = {
+            title_id: rank_key(title)
+            for title_id, title in self._titles.items()
+        }
+        self._keys = sorted(
+            key for title_id, (name, *_) in self._titles.items()
+            for key in self.make_keys(title_id, name)
+        )
+        self._results = {}
+        self._built_at = time.monotonic()
+
+    def _discard(self, title_id):
+        title = self._titles.pop(title_id, None)
+        if title is None:
+            return
+        self._results = {}
+        del self._ranks[title_id]
+        for key in self.make_keys(title_id, title[0]):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def reset(self):
+        with self._lock:
+            self._keys = None
+            self._titles = {}
+            self._results = {}
+
+    def add(self, title):
+        """
+        Добавляет или обновляет произведение в построенном индексе.
+        Рейтинг уже известного произведения меняется только через
+        apply_score_delta: в title он может быть устаревшим.
+        """
+        with self._lock:
+            if self._keys is None:
+                return
+            rating = title.rating_sum, title.rating_count
+            if title.pk in self._titles:
+                rating = self._titles[title.pk][2:]
+            self._discard(title.pk)
+            self._titles[title.pk] = (title.name, title.year, *rating)
+            self._ranks[title.pk] = rank_key(self._titles[title.pk])
+            self._results = {}
+            for key in self.make_keys(title.pk, title.name):
+                bisect.insort(self._keys, key)
+
+    def remove(self, title_id):
+        with self._lock:
+            if self._keys is not None:
+                self._discard(title_id)
+
+    def apply_score_delta(self, title_id, score_delta, count_delta):
+        """Повторяет в индексе изменение рейтинга из reviews.ratings."""
+        with self._lock:
+            title = self._titles.get(title_id)
+            if title is None:
+                return
+            name, year, rating_sum, rating_count = title
+            self._titles[title_id] = (
+                name, year, rating_sum + score_delta,
+                rating_count + count_delta
+            )
+            self._ranks[title_id] = rank_key(self._titles[title_id])
+            self._results = {}
+
+    def lookup(self, query, limit):
+        """
+        Возвращает до limit (не больше AUTOCOMPLETE_MAX_LIMIT) произведений
+        со словом в названии, начинающимся с query, в виде кортежей
+        (id, название, год, сумма оценок, количество оценок).
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        with self._lock:
+            if (
+                self._keys is None
+                or time.monotonic() - self._built_at
+                > settings.AUTOCOMPLETE_MAX_AGE
+            ):
+                self._build()
+            title_ids = self._results.get(prefix)
+            if title_ids is None:
+                title_ids = self._find(prefix)
+            return [
+                (title_id, *self._titles[title_id])
+                for title_id in title_ids[:limit]
+            ]
+
+    def _find(self, prefix):
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + LAST_CHAR,), start)
+        title_ids = heapq.nsmallest(
+            settings.AUTOCOMPLETE_MAX_LIMIT,
+            {title_id for _, title_id in self._keys[start:end]},
+            key=self._ranks.__getitem__
+        )
+        if len(self._results) >= RESULTS_CACHE_SIZE:
+            self._results = {}
+        self._results[prefix] = title_ids
+        return title_ids
+
+
+title_index = TitlePrefixIndex()
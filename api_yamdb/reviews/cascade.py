@@ -0,0 +1,82 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+from reviews import ratings
+from reviews.autocomplete import title_index
+from reviews.models import Review, Title, TitleGenre
+from reviews.search import get_backend
+
+# Незавершенное удаление внутри deletion(); None - удаления нет.
+_pending = ContextVar('cascade_pending', default=None)
+
+
+class PendingDeletion:
+    """
+    Изменения рейтинга от удаленных отзывов по произведениям, удаленные
+    произведения, рейтинг которых пересчитывать не нужно, и id удаленных
+    объектов по моделям для поискового индекса.
+    """
+
+    def __init__(self):
+        self.score_deltas = defaultdict(lambda: [0, 0])
+        self.deleted_titles = set()
+        self.removed = defaultdict(list)
+
+    def add_review(self, review):
+        delta = self.score_deltas[review.title_id]
+        delta[0] -= review.score
+        delta[1] -= 1
+
+    def apply(self):
+        """
+        Удаляет объекты из поискового индекса одним запросом на модель
+        и обновляет рейтинг оставшихся произведений одним проходом.
+        """
+        backend = get_backend()
+        for model, pks in self.removed.items():
+            backend.remove_many(model, pks)
+        deltas = {
+            title_id: tuple(delta)
+            for title_id, delta in self.score_deltas.items()
+            if title_id not in self.deleted_titles
+        }
+        if not deltas:
+            return
+        ratings.rebuild_ratings(
+            Title, Review, Title.objects.filter(pk__in=list(deltas))
+        )
+        ratings.copy_genre_ratings(TitleGenre, Title, list(deltas))
+
+        def update_index():
+            for title_id, (score_delta, count_delta) in deltas.items():
+                title_index.apply_score_delta(
+                    title_id, score_delta, count_delta
+                )
+
+        transaction.on_commit(update_index)
+
+
+def get_pending():
+    return _pending.get()
+
+
+@contextmanager
+def deletion():
+    """
+    Удаление внутри блока может каскадно удалить много отзывов
+    и комментариев. Сигналы не обновляют рейтинг и поисковый индекс по
+    каждой строке, а копят изменения; при выходе из блока в той же
+    транзакции строки удаляются из индекса пачками, а рейтинг затронутых
+    и не удаленных произведений пересчитывается один раз.
+    """
+    pending = PendingDeletion()
+    with transaction.atomic():
+        token = _pending.set(pending)
+        try:
+            yield pending
+        finally:
+            _pending.reset(token)
+        pending.apply()
@@ -0,0 +1,76 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+FORMATS = (CSV, NDJSON)
+
+CONTENT_TYPES = {
+    CSV: 'text/csv',
+    NDJSON: 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def format_value(value):
+    """Приводит значение поля к виду, в котором оно хранится в CSV файлах."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.astimezone(datetime.timezone.utc).isoformat(
+            timespec='milliseconds'
+        ).replace('+00:00', 'Z')
+    return value
+
+
+def iter_rows(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Построчно отдает значения полей таблицы в порядке столбцов CSV.
+    Строки читаются из БД курсором пачками по chunk_size.
+    """
+    queryset = table.model.objects.order_by('pk').values_list(
+        *table.columns.values()
+    )
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [format_value(value) for value in row]
+
+
+def iter_export(table, output_format=CSV, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Отдает содержимое таблицы текстовыми кусками по chunk_size строк:
+    в формате CSV с тем же заголовком, что и у файлов static/data,
+    или в формате NDJSON - по одному JSON объекту на строку.
+    """
+    columns = list(table.columns)
+    buffer = io.StringIO()
+    if output_format == CSV:
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(columns)
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(dict(zip(columns, row)),
+                                    ensure_ascii=False))
+            buffer.write('\n')
+    for number, row in enumerate(iter_rows(table, chunk_size), 1):
+        write(row)
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks, encoding='utf-8'):
+    """Сжимает поток текстовых кусков в формат gzip на лету."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
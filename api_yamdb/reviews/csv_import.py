@@ -0,0 +1,486 @@
+import codecs
+import csv
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from contextlib import contextmanager, nullcontext
+
+import chardet
+import django
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews import search
+from reviews.models import (
+    Category, Comment, Genre, ImportCheckpoint, Review, Title, TitleGenre
+)
+from reviews.ratings import copy_genre_ratings, rebuild_ratings
+
+User = get_user_model()
+
+CsvTable = namedtuple('CsvTable', ('name', 'model', 'columns'))
+ImportResult = namedtuple(
+    'ImportResult',
+    ('name', 'rows', 'inserted', 'updated', 'seconds', 'skipped')
+)
+
+# Соответствие столбцов CSV файлов полям моделей, в порядке загрузки.
+CSV_TABLES = (
+    CsvTable('users', User, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    CsvTable('category', Category, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }),
+    CsvTable('genre', Genre, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }),
+    CsvTable('titles', Title, {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category_id',
+    }),
+    CsvTable('genre_title', TitleGenre, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'genre_id': 'genre_id',
+    }),
+    CsvTable('review', Review, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'text': 'text',
+        'author': 'author_id',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }),
+    CsvTable('comments', Comment, {
+        'id': 'id',
+        'review_id': 'review_id',
+        'text': 'text',
+        'author': 'author_id',
+        'pub_date': 'pub_date',
+    }),
+)
+
+INSERT = 'insert'
+UPSERT = 'upsert'
+MODES = (INSERT, UPSERT)
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_SNIFF_BYTES = 64 * 1024
+
+
+class CsvImportError(Exception):
+    """Ошибка в данных или структуре загружаемых CSV файлов."""
+
+
+def detect_encoding(file_path, sniff_bytes=DEFAULT_SNIFF_BYTES):
+    """
+    Определяет кодировку файла по первым `sniff_bytes` байтам.
+    Префикс обрезается по последнему переводу строки, чтобы не разрывать
+    многобайтовый символ.
+    """
+    with open(file_path, 'rb') as file:
+        prefix = file.read(sniff_bytes)
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    line_end = prefix.rfind(b'\n')
+    if line_end > 0:
+        prefix = prefix[:line_end + 1]
+    encoding = chardet.detect(prefix)['encoding']
+    # В префиксе может не оказаться ни одного не-ASCII символа.
+    if encoding is None or encoding.lower() == 'ascii':
+        return 'utf-8'
+    return encoding
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Отключает auto_now_add на время загрузки,
+    чтобы даты из CSV не заменялись текущим временем.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def get_table(name):
+    for table in CSV_TABLES:
+        if table.name == name:
+            return table
+    raise CsvImportError(f'Неизвестная таблица: {name}.')
+
+
+def init_worker():
+    """Настраивает Django в процессе-обработчике, запущенном через spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+def clean_rows(table_name, header, first_record, rows):
+    """
+    Приводит строки CSV к типам полей модели и проверяет обязательность
+    и допустимые значения (choices). Валидаторы API не применяются:
+    в каталоге есть произведения старше года, разрешенного для новых.
+    Выполняется в пуле процессов, к БД не обращается: существование
+    связанных объектов проверяется один раз в конце загрузки.
+    """
+    table = get_table(table_name)
+    positions = {column: header.index(column) for column in table.columns}
+    fields = {}
+    for column, field_name in table.columns.items():
+        field = table.model._meta.get_field(field_name)
+        fields[column] = (field_name, field)
+    cleaned = []
+    for record, row in enumerate(rows, first_record):
+        values = {}
+        try:
+            for column, (field_name, field) in fields.items():
+                value = row[positions[column]]
+                if field.is_relation:
+                    value = field.target_field.to_python(value)
+                else:
+                    value = field.to_python(value)
+                    field.validate(value, None)
+                values[field_name] = value
+        except ValidationError as error:
+            raise CsvImportError(
+                f'{table_name}.csv, запись {record}, поле {column}: '
+                f'{"; ".join(error.messages)}'
+            )
+        except IndexError:
+            raise CsvImportError(
+                f'{table_name}.csv, запись {record}: не хватает столбцов.'
+            )
+        cleaned.append(values)
+    return cleaned
+
+
+def iter_lines(csv_file, encoding, position):
+    """
+    Отдает декодированные строки двоичного файла и записывает в
+    `position['offset']` смещение в байтах после последней отданной строки.
+    csv.reader запрашивает строки ровно до конца очередной записи,
+    поэтому после каждой записи смещение указывает на начало следующей.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in csv_file:
+        position['offset'] += len(line)
+        yield decoder.decode(line)
+
+
+def read_chunks(reader, batch_size, position, first_record=1):
+    """
+    Отдает пачки сырых записей CSV с номером первой записи
+    и смещением в файле после последней записи пачки.
+    """
+    rows = []
+    for row in reader:
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield first_record, rows, position['offset']
+            first_record += len(rows)
+            rows = []
+    if rows:
+        yield first_record, rows, position['offset']
+
+
+def read_batches(file_path, table, batch_size, sniff_bytes, executor=None,
+                 max_in_flight=1, offset=0, records=0):
+    """
+    Построчно читает CSV файл и отдает пачки объектов по batch_size вместе
+    со смещением в байтах и номером последней записи пачки.
+    Если передано ненулевое смещение, чтение продолжается с него.
+    С пулом процессов пачки разбираются параллельно, но в пуле держится
+    ограниченное число пачек, чтобы память не зависела от размера файла.
+    """
+    encoding = detect_encoding(file_path, sniff_bytes)
+    position = {'offset': 0}
+    with open(file_path, 'rb') as csv_file:
+        reader = csv.reader(iter_lines(csv_file, encoding, position))
+        header = next(reader, None)
+        if header is None:
+            return
+        missing = set(table.columns) - set(header)
+        if missing:
+            raise CsvImportError(
+                f'{table.name}.csv: нет столбцов {", ".join(sorted(missing))}.'
+            )
+        if offset > position['offset']:
+            csv_file.seek(offset)
+            position['offset'] = offset
+        chunks = read_chunks(reader, batch_size, position, records + 1)
+        if executor is None:
+            for first_record, rows, end in chunks:
+                yield [
+                    table.model(**values) for values in
+                    clean_rows(table.name, header, first_record, rows)
+                ], end, first_record + len(rows) - 1
+            return
+        in_flight = deque()
+        for first_record, rows, end in chunks:
+            in_flight.append((executor.submit(
+                clean_rows, table.name, header, first_record, rows
+            ), end, first_record + len(rows) - 1))
+            if len(in_flight) >= max_in_flight:
+                future, end, last_record = in_flight.popleft()
+                yield [
+                    table.model(**values) for values in future.result()
+                ], end, last_record
+        while in_flight:
+            future, end, last_record = in_flight.popleft()
+            yield [
+                table.model(**values) for values in future.result()
+            ], end, last_record
+
+
+def upsert_batch(table, batch):
+    """
+    Добавляет новые объекты и обновляет по id только изменившиеся.
+    Возвращает количество добавленных и обновленных объектов.
+    """
+    fields = [name for name in table.columns.values() if name != 'id']
+    existing = {
+        row['id']: row for row in table.model.objects.filter(
+            pk__in=[instance.pk for instance in batch]
+        ).values('id', *fields)
+    }
+    created = [
+        instance for instance in batch if instance.pk not in existing
+    ]
+    changed = [
+        instance for instance in batch
+        if instance.pk in existing and any(
+            getattr(instance, name) != existing[instance.pk][name]
+            for name in fields
+        )
+    ]
+    table.model.objects.bulk_create(created)
+    if changed:
+        # bulk_update не заполняет поля auto_now, например updated_at.
+        auto_now = [
+            field for field in table.model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+        for instance in changed:
+            for field in auto_now:
+                field.pre_save(instance, add=False)
+        table.model.objects.bulk_update(
+            changed, fields + [field.attname for field in auto_now]
+        )
+    return len(created), len(changed)
+
+
+def get_checkpoint(table, file_path, restart=False):
+    """
+    Возвращает контрольную точку загрузки файла.
+    Точка действительна, только пока не изменились размер и время
+    изменения файла, иначе загрузка начинается с начала.
+    """
+    stat = file_path.stat()
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        table=table.name,
+        defaults={'file_size': stat.st_size, 'file_mtime': stat.st_mtime_ns}
+    )
+    if restart or (checkpoint.file_size, checkpoint.file_mtime) != (
+        stat.st_size, stat.st_mtime_ns
+    ):
+        checkpoint.file_size = stat.st_size
+        checkpoint.file_mtime = stat.st_mtime_ns
+        checkpoint.offset = checkpoint.records = 0
+        checkpoint.save()
+    return checkpoint
+
+
+def import_table(table, file_path, batch_size=DEFAULT_BATCH_SIZE,
+                 sniff_bytes=DEFAULT_SNIFF_BYTES, progress=None,
+                 executor=None, max_in_flight=1, write_lock=None,
+                 mode=INSERT, restart=False):
+    """
+    Загружает CSV файл в таблицу пачками через bulk_create, в режиме
+    upsert также обновляет изменившиеся строки.
+    Каждая пачка сохраняется в отдельной транзакции вместе с контрольной
+    точкой, поэтому прерванная загрузка продолжается с места остановки,
+    а повторный запуск на том же файле ничего не загружает.
+    """
+    started = time.monotonic()
+    rows = inserted = updated = 0
+    if write_lock is None:
+        write_lock = nullcontext()
+    with write_lock:
+        checkpoint = get_checkpoint(table, file_path, restart)
+    if checkpoint.offset >= checkpoint.file_size:
+        return ImportResult(table.name, 0, 0, 0, 0, True)
+    with keep_auto_now_add(table.model):
+        batches = read_batches(
+            file_path, table, batch_size, sniff_bytes, executor,
+            max_in_flight, checkpoint.offset, checkpoint.records
+        )
+        for batch, offset, records in batches:
+            with write_lock, transaction.atomic():
+                if mode == UPSERT:
+                    created, changed = upsert_batch(table, batch)
+                else:
+                    table.model.objects.bulk_create(batch)
+                    created, changed = len(batch), 0
+                checkpoint.offset = offset
+                checkpoint.records = records
+                checkpoint.save(
+                    update_fields=('offset', 'records', 'updated_at')
+                )
+            rows += len(batch)
+            inserted += created
+            updated += changed
+            if progress is not None:
+                progress(table.name, rows, time.monotonic() - started)
+    checkpoint.offset = checkpoint.file_size
+    with write_lock:
+        checkpoint.save(update_fields=('offset', 'updated_at'))
+    return ImportResult(
+        table.name, rows, inserted, updated, time.monotonic() - started,
+        False
+    )
+
+
+def get_dependencies(tables):
+    """
+    Строит граф зависимостей таблиц по внешним ключам моделей.
+    Учитываются только загружаемые таблицы, остальные уже должны быть в БД.
+    """
+    names = {table.model: table.name for table in tables}
+    return {
+        table.name: {
+            names[field.related_model]
+            for field in table.model._meta.concrete_fields
+            if field.many_to_one
+            and field.related_model in names
+            and field.related_model is not table.model
+        }
+        for table in tables
+    }
+
+
+def run_in_dependency_order(tables, load):
+    """
+    Вызывает `load` для каждой таблицы в отдельном потоке: таблица
+    запускается, как только завершены все таблицы, на которые она
+    ссылается, поэтому независимые таблицы обрабатываются одновременно.
+    """
+    dependencies = get_dependencies(tables)
+    results = []
+    pending = list(tables)
+    running = {}
+    done = set()
+    with ThreadPoolExecutor(max_workers=len(tables) or 1) as threads:
+        while pending or running:
+            ready = [
+                table for table in pending
+                if dependencies[table.name] <= done
+            ]
+            if not ready and not running:
+                raise CsvImportError(
+                    'Циклическая зависимость между таблицами: '
+                    f'{", ".join(table.name for table in pending)}.'
+                )
+            for table in ready:
+                pending.remove(table)
+                running[threads.submit(load, table)] = table
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = running.pop(future)
+                results.append(future.result())
+                done.add(table.name)
+    return results
+
+
+def import_tables(tables, path, batch_size=DEFAULT_BATCH_SIZE,
+                  sniff_bytes=DEFAULT_SNIFF_BYTES, jobs=1, progress=None,
+                  mode=INSERT, restart=False):
+    """
+    Загружает таблицы в порядке зависимостей по внешним ключам.
+    Разбор и проверка строк выполняются в пуле из `jobs` процессов.
+    Проверка внешних ключей на время загрузки отключается и выполняется
+    один раз в конце по всем загруженным таблицам.
+    """
+    for table in tables:
+        if not (path / f'{table.name}.csv').exists():
+            raise CsvImportError(f'Файл {path / table.name}.csv не найден.')
+    # SQLite допускает только одного пишущего, поэтому вставки
+    # сериализуются, а параллельными остаются чтение и разбор файлов.
+    write_lock = threading.Lock() if connection.vendor == 'sqlite' else None
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker
+        )
+
+    def load(table):
+        try:
+            with connection.constraint_checks_disabled():
+                return import_table(
+                    table, path / f'{table.name}.csv', batch_size,
+                    sniff_bytes, progress, executor, jobs * 2, write_lock,
+                    mode, restart
+                )
+        finally:
+            connection.close()
+
+    try:
+        results = run_in_dependency_order(tables, load)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    connection.check_constraints(
+        table_names=[table.model._meta.db_table for table in tables]
+    )
+    return results
+
+
+def reset_sequences(models):
+    """Сдвигает счетчики первичных ключей после вставки явных id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def refresh_derived_data(models):
+    """
+    Обновляет после массовой вставки то, что при обычном сохранении
+    обновляют сигналы: bulk_create их не отправляет.
+    """
+    if Title in models or Review in models:
+        rebuild_ratings(Title, Review)
+    if {Title, Review, TitleGenre} & set(models):
+        copy_genre_ratings(TitleGenre, Title)
+    if any(search.get_document(model) for model in models):
+        search.get_backend().rebuild()
+    caches[settings.API_CACHE_ALIAS].clear()
@@ -0,0 +1,64 @@
+import gzip
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import csv_export, csv_import
+
+
+class Command(BaseCommand):
+    """Выгружает данные из БД в CSV или NDJSON файлы потоком."""
+    help = (
+        'Экспортирует таблицы (users, category, genre, titles, genre_title, '
+        'review, comments) в файлы формата static/data/*.csv или NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Таблицы для выгрузки, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--output', default=Path('.'), type=Path,
+            help='Директория для файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--format', dest='output_format', default=csv_export.CSV,
+            choices=csv_export.FORMATS, help='Формат файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать файлы в gzip.'
+        )
+        parser.add_argument(
+            '--chunk-size', default=csv_export.DEFAULT_CHUNK_SIZE, type=int,
+            help='Количество строк, читаемых из БД за один раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        try:
+            tables = [
+                csv_import.get_table(name) for name in options['tables']
+            ] or csv_import.CSV_TABLES
+        except csv_import.CsvImportError as error:
+            raise CommandError(error)
+        options['output'].mkdir(parents=True, exist_ok=True)
+        for table in tables:
+            file_name = f'{table.name}.{options["output_format"]}'
+            if options['gzip']:
+                file_name += '.gz'
+            file_path = options['output'] / file_name
+            started = time.monotonic()
+            opener = gzip.open if options['gzip'] else open
+            with opener(file_path, 'wt', encoding='utf-8',
+                        newline='') as file:
+                for chunk in csv_export.iter_export(
+                    table, options['output_format'], options['chunk_size']
+                ):
+                    file.write(chunk)
+            self.stdout.write(self.style.SUCCESS(
+                f'{table.name}: {file_path} '
+                f'за {time.monotonic() - started:.2f} с'
+            ))
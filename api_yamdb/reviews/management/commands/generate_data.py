@@ -0,0 +1,118 @@
+import datetime
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import datagen
+
+
+class Command(BaseCommand):
+    """
+    Генерирует синтетические данные с неравномерной популярностью
+    произведений в БД или в CSV файлы для import_csv.
+    """
+    help = (
+        'Добавляет в БД или записывает в CSV файлы синтетических '
+        'пользователей, произведения, отзывы и комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        for name, size in datagen.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}', default=size, type=int,
+                help=f'Количество строк, по умолчанию {size}.'
+            )
+        parser.add_argument(
+            '--seed', default=0, type=int,
+            help='Одинаковые seed и --end-date дают одинаковые данные.'
+        )
+        parser.add_argument(
+            '--skew', default=datagen.DEFAULT_SKEW, type=float,
+            help=(
+                'Показатель распределения Ципфа для популярности '
+                'произведений, жанров и категорий; 0 - равномерно.'
+            )
+        )
+        parser.add_argument(
+            '--roles', default=datagen.DEFAULT_ROLES, type=self.parse_roles,
+            help=(
+                'Доли ролей пользователей, например '
+                '"user=90,moderator=8,admin=2".'
+            )
+        )
+        parser.add_argument(
+            '--end-date', type=datetime.date.fromisoformat,
+            help=(
+                'Дата ГГГГ-ММ-ДД, до которой генерируются даты отзывов '
+                'и комментариев, по умолчанию сегодня.'
+            )
+        )
+        parser.add_argument(
+            '--output', type=Path,
+            help=(
+                'Директория для CSV файлов формата static/data. Без нее '
+                'данные добавляются в БД.'
+            )
+        )
+        parser.add_argument(
+            '--batch-size', default=datagen.DEFAULT_BATCH_SIZE, type=int,
+            help='Количество строк в одном bulk_create.'
+        )
+
+    @staticmethod
+    def parse_roles(value):
+        roles = {}
+        for item in value.split(','):
+            role, _, weight = item.partition('=')
+            roles[role.strip()] = float(weight)
+        return roles
+
+    def check_options(self, options):
+        if any(options[name] < 0 for name in datagen.DEFAULT_SIZES):
+            raise CommandError('Размеры данных не могут быть меньше нуля.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if options['skew'] < 0:
+            raise CommandError('--skew не может быть меньше нуля.')
+        roles = options['roles']
+        unknown = set(roles) - {
+            role for role, _ in datagen.User.ROLE_CHOICES
+        }
+        if unknown:
+            raise CommandError(
+                f'Неизвестные роли: {", ".join(sorted(unknown))}.'
+            )
+        if any(weight < 0 for weight in roles.values()) or not sum(
+            roles.values()
+        ):
+            raise CommandError(
+                'Доли ролей должны быть неотрицательными, хотя бы одна '
+                'больше нуля.'
+            )
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        generator = datagen.DataGenerator(
+            {name: options[name] for name in datagen.DEFAULT_SIZES},
+            seed=options['seed'],
+            skew=options['skew'],
+            roles=options['roles'],
+            end_date=options['end_date'],
+            first_ids=None if options['output'] else datagen.next_ids(),
+        )
+        started = time.monotonic()
+        if options['output']:
+            options['output'].mkdir(parents=True, exist_ok=True)
+            counts = datagen.write_csv(generator, options['output'])
+        else:
+            counts = datagen.insert(generator, options['batch_size'])
+        seconds = time.monotonic() - started
+        rows = sum(counts.values())
+        self.stdout.write(
+            ', '.join(f'{name} {count}' for name, count in counts.items())
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{rows} строк за {seconds:.1f} с '
+            f'({rows / seconds if seconds else rows:.0f} строк/с)'
+        ))
@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from reviews import csv_import
+
+
+class Command(BaseCommand):
+    """Загружает данные из CSV файлов в БД пачками через bulk_create."""
+    help = (
+        'Импортирует CSV файлы (users, category, genre, titles, genre_title, '
+        'review, comments) в БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Таблицы для загрузки, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--path', default=settings.BASE_DIR / 'static' / 'data',
+            type=Path, help='Директория с CSV файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', default=csv_import.DEFAULT_BATCH_SIZE, type=int,
+            help='Количество строк в одной транзакции bulk_create.'
+        )
+        parser.add_argument(
+            '--sniff-bytes', default=csv_import.DEFAULT_SNIFF_BYTES,
+            type=int,
+            help='Сколько первых байт файла читать для определения кодировки.'
+        )
+        parser.add_argument(
+            '--jobs', default=os.cpu_count() or 1, type=int,
+            help='Количество процессов для разбора и проверки строк.'
+        )
+        parser.add_argument(
+            '--mode', default=csv_import.INSERT, choices=csv_import.MODES,
+            help=(
+                'insert - только добавление строк, upsert - добавление '
+                'новых и обновление изменившихся строк по id.'
+            )
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Загрузить файлы с начала, не учитывая контрольные точки.'
+        )
+
+    def get_tables(self, names):
+        tables = {table.name: table for table in csv_import.CSV_TABLES}
+        unknown = set(names) - set(tables)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(tables)}.'
+            )
+        return [
+            table for table in csv_import.CSV_TABLES
+            if not names or table.name in names
+        ]
+
+    def progress(self, name, rows, seconds):
+        if self.verbosity > 1:
+            self.stdout.write(f'{name}: загружено {rows} строк...')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.verbosity = options['verbosity']
+        tables = self.get_tables(options['tables'])
+        try:
+            results = csv_import.import_tables(
+                tables, options['path'],
+                batch_size=options['batch_size'],
+                sniff_bytes=options['sniff_bytes'],
+                jobs=options['jobs'],
+                progress=self.progress,
+                mode=options['mode'],
+                restart=options['restart']
+            )
+        except (csv_import.CsvImportError, IntegrityError) as error:
+            raise CommandError(error)
+        for result in results:
+            if result.skipped:
+                self.stdout.write(
+                    f'{result.name}: файл уже загружен, пропущен.'
+                )
+                continue
+            speed = result.rows / result.seconds if result.seconds else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'{result.name}: {result.rows} строк за '
+                f'{result.seconds:.2f} с ({speed:.0f} строк/с), '
+                f'добавлено {result.inserted}, обновлено {result.updated}'
+            ))
+        models = [table.model for table in tables]
+        csv_import.reset_sequences(models)
+        csv_import.refresh_derived_data(models)
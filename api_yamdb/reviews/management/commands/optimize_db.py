@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """
+    Обновляет статистику планировщика запросов. Запускается периодически,
+    например из cron раз в сутки и после массовой загрузки данных.
+    """
+    help = (
+        'Обновляет статистику индексов для планировщика запросов '
+        '(PRAGMA optimize или ANALYZE) и сбрасывает журнал WAL SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Псевдоним БД из DATABASES.'
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help=(
+                'Полный ANALYZE всех таблиц. Без флага в SQLite выполняется '
+                'PRAGMA optimize, который анализирует только таблицы, '
+                'статистика которых могла устареть.'
+            )
+        )
+
+    def run(self, cursor, sql):
+        started = time.monotonic()
+        cursor.execute(sql)
+        rows = cursor.fetchall() if cursor.description else []
+        self.stdout.write(f'{sql}: {time.monotonic() - started:.2f} с')
+        return rows
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with connection.cursor() as cursor:
+            if connection.vendor != 'sqlite' or options['analyze']:
+                self.run(cursor, 'ANALYZE')
+            else:
+                self.run(cursor, 'PRAGMA optimize')
+            if connection.vendor == 'sqlite':
+                journal_mode, = self.run(cursor, 'PRAGMA journal_mode')[0]
+                if journal_mode.lower() == 'wal':
+                    # Переносит журнал в файл БД и обрезает его, иначе
+                    # при постоянных читателях журнал только растет.
+                    self.run(cursor, 'PRAGMA wal_checkpoint(TRUNCATE)')
+        self.stdout.write(self.style.SUCCESS('Статистика БД обновлена.'))
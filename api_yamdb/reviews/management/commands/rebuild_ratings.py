@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Review, Title, TitleGenre
+from reviews.ratings import copy_genre_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    """Пересчитывает сохраненный рейтинг всех произведений с нуля."""
+    help = 'Пересчитывает сумму, количество и среднее оценок произведений.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings(Title, Review)
+            copy_genre_ratings(TitleGenre, Title)
+        caches[settings.API_CACHE_ALIAS].clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинг пересчитан для {updated} произведений.'
+            )
+        )
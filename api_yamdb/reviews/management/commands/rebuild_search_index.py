@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.search import get_backend
+
+
+class Command(BaseCommand):
+    """Перестраивает полнотекстовый индекс по таблицам с нуля."""
+    help = (
+        'Перестраивает поисковый индекс произведений, отзывов и '
+        'комментариев.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, unique=True, verbose_name='Таблица')),
+                ('file_size', models.PositiveBigIntegerField(verbose_name='Размер файла')),
+                ('file_mtime', models.BigIntegerField(verbose_name='Время изменения файла')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Загружено байт')),
+                ('records', models.PositiveBigIntegerField(default=0, verbose_name='Загружено записей')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Таблица FTS5, индексируемые поля и веса полей для bm25.
+SEARCH_TABLES = (
+    ('search_title', 'reviews_title', ('name', 'description'), (10.0, 1.0)),
+    ('search_review', 'reviews_review', ('text',), (1.0,)),
+    ('search_comment', 'reviews_comment', ('text',), (1.0,)),
+)
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, source, fields, weights in SEARCH_TABLES:
+        columns = ', '.join(fields)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {table} USING fts5({columns}, '
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        rank = ', '.join(str(weight) for weight in weights)
+        schema_editor.execute(
+            f"INSERT INTO {table} ({table}, rank) VALUES ('rank', "
+            f"'bm25({rank})')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {table} (rowid, {columns}) '
+            f'SELECT id, {columns} FROM {source}'
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, _, _, _ in SEARCH_TABLES:
+        schema_editor.execute(f'DROP TABLE {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 04:47
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    TitleGenre.objects.update(rating=Subquery(
+        Title.objects.filter(pk=OuterRef('title_id')).values('rating')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titlegenre',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг произведения'),
+        ),
+        migrations.RunPython(copy_ratings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count'], name='title_rating_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlegenre',
+            index=models.Index(fields=['genre', 'rating', 'title'], name='titlegenre_genre_rating_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlegenre',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_title_genre'),
+        ),
+    ]
@@ -15,6 +15,10 @@ class Genre(models.Model):
         unique=True
     )
     slug = models.SlugField(verbose_name='Слаг', max_length=50, unique=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Жанр'
@@ -32,6 +36,10 @@ class Category(models.Model):
         unique=True
     )
     slug = models.SlugField(verbose_name='Слаг', max_length=50, unique=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Категория'
@@ -41,6 +49,10 @@ class Category(models.Model):
         return self.name
 
 
+# Денормализованный рейтинг произведения, см. reviews.ratings.
+RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
+
+
 class Title(models.Model):
     """Модель произведений."""
     name = models.CharField(max_length=256, verbose_name='Название')
@@ -61,23 +73,92 @@ class Title(models.Model):
         on_delete=models.CASCADE,
         related_name='category'
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(
+                fields=('rating_count',), name='title_rating_count_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Рейтинг меняется только UPDATE-запросами с F() из reviews.ratings,
+        поэтому сохранение существующего произведения не записывает
+        загруженные ранее значения рейтинга поверх добавленных отзывов.
+        """
+        if not self._state.adding and not force_insert and (
+            update_fields is None
+        ):
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RATING_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
 
 class TitleGenre(models.Model):
     """Промежуточная таблица для Title и Genre"""
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+    # Копия рейтинга произведения: лучшие произведения жанра выбираются
+    # одним проходом по индексу (genre, rating, title).
+    rating = models.FloatField(
+        verbose_name='Рейтинг произведения',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Жанр и произведение'
         verbose_name_plural = 'Жанры и произведения'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'genre'), name='unique_title_genre'
+            ),
+        )
+        indexes = (
+            # Покрывающий индекс для фильтра по жанрам: id произведений
+            # берутся из индекса без чтения таблицы.
+            models.Index(
+                fields=('genre', 'title'), name='titlegenre_genre_title_idx'
+            ),
+            models.Index(
+                fields=('genre', 'rating', 'title'),
+                name='titlegenre_genre_rating_idx'
+            ),
+        )
 
     def __str__(self):
         return f"Произведение: {self.title}, Жанр: {self.genre}"
@@ -108,10 +189,21 @@ class Review(models.Model):
         auto_now_add=True,
         editable=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        ordering = ('pub_date', 'id')
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -141,10 +233,54 @@ class Comment(models.Model):
         auto_now_add=True,
         editable=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        ordering = ('pub_date', 'id')
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Контрольная точка загрузки CSV файла командой import_csv.
+    Хранит смещение в байтах, до которого файл уже загружен в БД.
+    """
+    table = models.CharField(
+        verbose_name='Таблица',
+        max_length=64,
+        unique=True
+    )
+    file_size = models.PositiveBigIntegerField(verbose_name='Размер файла')
+    file_mtime = models.BigIntegerField(verbose_name='Время изменения файла')
+    offset = models.PositiveBigIntegerField(
+        verbose_name='Загружено байт',
+        default=0
+    )
+    records = models.PositiveBigIntegerField(
+        verbose_name='Загружено записей',
+        default=0
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Обновлено',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+    def __str__(self):
+        return f'{self.table}: {self.offset} из {self.file_size} байт'
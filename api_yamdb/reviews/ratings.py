@@ -0,0 +1,64 @@
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Now
+
+
+def apply_score_delta(title_model, title_id, score_delta, count_delta):
+    """
+    Изменяет сохраненный рейтинг произведения одним UPDATE-запросом.
+    Правая часть UPDATE видит старые значения полей, поэтому новая
+    средняя оценка считается из уже измененных суммы и количества.
+    """
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    title_model.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count__lte=-count_delta, then=Value(None)),
+            default=(
+                Cast(new_sum, FloatField()) / Cast(new_count, FloatField())
+            ),
+            output_field=FloatField(),
+        ),
+        updated_at=Now(),
+    )
+
+
+def rebuild_ratings(title_model, review_model, titles=None):
+    """
+    Пересчитывает рейтинг произведений по таблице отзывов с нуля.
+    Возвращает количество обновленных произведений.
+    """
+    reviews = review_model.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    if titles is None:
+        titles = title_model.objects.all()
+    return titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(res=Sum('score')).values('res')), 0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(res=Count('pk')).values('res')), 0
+        ),
+        rating=Subquery(
+            reviews.annotate(res=Avg('score')).values('res'),
+            output_field=FloatField()
+        ),
+        updated_at=Now(),
+    )
+
+
+def copy_genre_ratings(title_genre_model, title_model, title_ids=None):
+    """
+    Копирует рейтинг произведений в их связи с жанрами.
+    Возвращает количество обновленных связей.
+    """
+    links = title_genre_model.objects.all()
+    if title_ids is not None:
+        links = links.filter(title_id__in=title_ids)
+    return links.update(rating=Subquery(
+        title_model.objects.filter(pk=OuterRef('title_id')).values('rating')
+    ))
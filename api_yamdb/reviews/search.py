@@ -0,0 +1,230 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from reviews.models import Comment, Review, Title
+
+# Индексируемая модель: тип результата, модель и текстовые поля.
+SearchDocument = namedtuple('SearchDocument', 'kind model fields')
+
+DOCUMENTS = (
+    SearchDocument('title', Title, ('name', 'description')),
+    SearchDocument('review', Review, ('text',)),
+    SearchDocument('comment', Comment, ('text',)),
+)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def get_document(model):
+    for document in DOCUMENTS:
+        if document.model is model:
+            return document
+    return None
+
+
+def get_document_by_kind(kind):
+    for document in DOCUMENTS:
+        if document.kind == kind:
+            return document
+    raise KeyError(kind)
+
+
+def get_tokens(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+class BaseSearchBackend:
+    """
+    Интерфейс бэкенда полнотекстового поиска. Бэкенд поддерживает индекс
+    в актуальном состоянии (index/remove вызываются сигналами), фильтрует
+    и ранжирует querysets и ищет по всем индексируемым моделям сразу.
+    """
+
+    def index(self, instance):
+        raise NotImplementedError
+
+    def remove(self, instance):
+        self.remove_many(type(instance), [instance.pk])
+
+    def remove_many(self, model, pks):
+        """Удаляет из индекса объекты модели с id из pks."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Перестраивает индекс по таблицам моделей."""
+        raise NotImplementedError
+
+    def needs_rebuild(self):
+        return False
+
+    def filter(self, queryset, query):
+        """Оставляет в queryset объекты, подходящие под запрос."""
+        raise NotImplementedError
+
+    def rank(self, queryset, query):
+        """Упорядочивает queryset по релевантности."""
+        return queryset
+
+    def search(self, query, limit):
+        """
+        Ищет по всем моделям. Возвращает до limit пар (тип, id)
+        в порядке убывания релевантности.
+        """
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Поиск без индекса, через icontains по полям модели. Подходит для БД
+    без FTS5 и для отладки.
+    """
+
+    def index(self, instance):
+        pass
+
+    def remove_many(self, model, pks):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def filter(self, queryset, query):
+        document = get_document(queryset.model)
+        condition = Q()
+        for token in get_tokens(query):
+            token_condition = Q()
+            for field in document.fields:
+                token_condition |= Q(**{f'{field}__icontains': token})
+            condition &= token_condition
+        return queryset.filter(condition)
+
+    def search(self, query, limit):
+        results = []
+        for document in DOCUMENTS:
+            queryset = self.filter(document.model.objects.all(), query)
+            results.extend(
+                (document.kind, pk)
+                for pk in queryset.values_list('pk', flat=True)[:limit]
+            )
+        return results[:limit]
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """
+    Поиск по виртуальным таблицам SQLite FTS5, по одной на модель.
+    rowid записи индекса совпадает с id объекта, поэтому фильтр - это
+    подзапрос по индексу, а ранг (bm25 с весами полей, заданными
+    в миграции 0007_search_index) ищется по rowid.
+    """
+
+    @staticmethod
+    def table(document):
+        return f'search_{document.kind}'
+
+    @staticmethod
+    def match(query):
+        """
+        Превращает строку пользователя в запрос FTS5: каждое слово
+        экранируется и ищется по префиксу, все слова должны совпасть.
+        """
+        return ' '.join(f'"{token}"*' for token in get_tokens(query))
+
+    def index(self, instance):
+        document = get_document(type(instance))
+        columns = ', '.join(document.fields)
+        placeholders = ', '.join(['%s'] * len(document.fields))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {self.table(document)} '
+                f'(rowid, {columns}) VALUES (%s, {placeholders})',
+                [instance.pk] + [
+                    getattr(instance, field) for field in document.fields
+                ]
+            )
+
+    def remove_many(self, model, pks):
+        table = self.table(get_document(model))
+        batch_size = connection.features.max_query_params
+        with connection.cursor() as cursor:
+            for start in range(0, len(pks), batch_size):
+                batch = pks[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE rowid IN ({placeholders})',
+                    batch
+                )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS:
+                table = self.table(document)
+                columns = ', '.join(document.fields)
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(
+                    f'INSERT INTO {table} (rowid, {columns}) '
+                    f'SELECT id, {columns} '
+                    f'FROM {document.model._meta.db_table}'
+                )
+
+    def needs_rebuild(self):
+        """
+        Индекс не совпадает с таблицами по числу записей, например после
+        очистки БД командой flush, которая не знает о таблицах FTS5.
+        """
+        tables = connection.introspection.table_names()
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS:
+                if self.table(document) not in tables:
+                    return False
+                cursor.execute(
+                    f'SELECT COUNT(*) FROM {self.table(document)}'
+                )
+                if cursor.fetchone()[0] != document.model.objects.count():
+                    return True
+        return False
+
+    def filter(self, queryset, query):
+        table = self.table(get_document(queryset.model))
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+            (self.match(query),)
+        ))
+
+    def rank(self, queryset, query):
+        table = self.table(get_document(queryset.model))
+        opts = queryset.model._meta
+        pk_column = connection.ops.quote_name(opts.db_table) + '.' + (
+            connection.ops.quote_name(opts.pk.column)
+        )
+        return queryset.annotate(search_rank=RawSQL(
+            f'SELECT rank FROM {table} '
+            f'WHERE {table} MATCH %s AND rowid = {pk_column}',
+            (self.match(query),)
+        )).order_by('search_rank', 'pk')
+
+    def search(self, query, limit):
+        match = self.match(query)
+        parts = [
+            f"SELECT '{document.kind}', rowid, rank "
+            f'FROM {self.table(document)} '
+            f'WHERE {self.table(document)} MATCH %s'
+            for document in DOCUMENTS
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                ' UNION ALL '.join(parts) + ' ORDER BY 3 LIMIT %s',
+                [match] * len(parts) + [limit]
+            )
+            return [(kind, pk) for kind, pk, _ in cursor.fetchall()]
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
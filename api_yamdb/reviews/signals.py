@@ -0,0 +1,141 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from reviews import cascade, ratings
+from reviews.autocomplete import title_index
+from reviews.models import Comment, Review, Title, TitleGenre
+from reviews.search import get_backend
+
+
+def apply_score_delta(title_id, score_delta, count_delta):
+    """
+    Изменяет рейтинг произведения и его копию в связях с жанрами в БД
+    и, после фиксации транзакции, в индексе автодополнения.
+    """
+    ratings.apply_score_delta(Title, title_id, score_delta, count_delta)
+    ratings.copy_genre_ratings(TitleGenre, Title, (title_id,))
+    transaction.on_commit(lambda: title_index.apply_score_delta(
+        title_id, score_delta, count_delta
+    ))
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """Запоминает оценку и произведение отзыва до его изменения."""
+    instance._previous_score = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_score = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Обновляет рейтинг произведения при создании и изменении отзыва."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_score', None)
+    if created or previous is None:
+        apply_score_delta(instance.title_id, instance.score, 1)
+        return
+    title_id, score = previous
+    if title_id != instance.title_id:
+        apply_score_delta(title_id, -score, -1)
+        apply_score_delta(instance.title_id, instance.score, 1)
+    elif score != instance.score:
+        apply_score_delta(title_id, instance.score - score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет рейтинг произведения при удалении отзыва, в том числе
+    каскадном. Внутри cascade.deletion() изменение только запоминается.
+    """
+    pending = cascade.get_pending()
+    if pending is not None:
+        pending.add_review(instance)
+        return
+    apply_score_delta(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_delete, sender=Title)
+def skip_deleted_title_rating(sender, instance, **kwargs):
+    """Рейтинг удаленного внутри cascade.deletion() произведения не нужен."""
+    pending = cascade.get_pending()
+    if pending is not None:
+        pending.deleted_titles.add(instance.pk)
+
+
+@receiver(pre_save, sender=TitleGenre)
+def copy_title_rating(sender, instance, raw, **kwargs):
+    """Новая связь с жанром получает текущий рейтинг произведения."""
+    if raw:
+        return
+    if sender.title.is_cached(instance):
+        instance.rating = instance.title.rating
+    else:
+        instance.rating = Title.objects.filter(
+            pk=instance.title_id
+        ).values_list('rating', flat=True).first()
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def copy_title_rating_on_add(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """
+    Связи, созданные через Title.genre.add/set, сохраняются bulk_create
+    без pre_save, поэтому рейтинг в них копируется отдельно.
+    """
+    if action != 'post_add':
+        return
+    title_ids = pk_set if reverse else (instance.pk,)
+    ratings.copy_genre_ratings(TitleGenre, Title, title_ids)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, **kwargs):
+    get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Внутри cascade.deletion() объекты удаляются из индекса пачкой."""
+    pending = cascade.get_pending()
+    if pending is not None:
+        pending.removed[sender].append(instance.pk)
+        return
+    get_backend().remove(instance)
+
+
+@receiver(post_migrate)
+def sync_search_index(sender, **kwargs):
+    """
+    Перестраивает поисковый индекс, если он разошелся с таблицами,
+    например после очистки БД (flush), и сбрасывает индекс автодополнения.
+    """
+    if sender.label != 'reviews':
+        return
+    title_index.reset()
+    backend = get_backend()
+    if backend.needs_rebuild():
+        backend.rebuild()
+
+
+@receiver(post_save, sender=Title)
+def update_autocomplete_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: title_index.add(instance))
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    title_id = instance.pk
+    transaction.on_commit(lambda: title_index.remove(title_id))
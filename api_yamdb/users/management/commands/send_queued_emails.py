@@ -0,0 +1,70 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    """Отправляет письма из очереди пачками через одно соединение."""
+    help = 'Отправляет письма из очереди исходящих писем (outbox).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', default=outbox.DEFAULT_BATCH_SIZE, type=int,
+            help='Количество писем, захватываемых за один раз.'
+        )
+        parser.add_argument(
+            '--max-attempts', default=outbox.DEFAULT_MAX_ATTEMPTS, type=int,
+            help='После стольких неудачных попыток письмо получает статус '
+                 'dead.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые письма.'
+        )
+        parser.add_argument(
+            '--interval', default=5, type=float,
+            help='Пауза в секундах между проверками очереди в режиме --loop.'
+        )
+
+    def drain(self, connection, batch_size, max_attempts):
+        """Отправляет письма, пока в очереди есть готовые к отправке."""
+        sent = failed = 0
+        while True:
+            emails = outbox.claim_batch(batch_size)
+            if not emails:
+                return sent, failed
+            batch_sent, batch_failed = outbox.send_batch(
+                emails, connection, max_attempts
+            )
+            sent += batch_sent
+            failed += batch_failed
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        while True:
+            try:
+                # Соединение открывается заранее, тогда backend не закрывает
+                # его после каждого письма и вся пачка идет через него.
+                connection.open()
+            except outbox.SEND_ERRORS as error:
+                if not options['loop']:
+                    raise CommandError(f'Почтовый сервер недоступен: {error}')
+                self.stderr.write(f'Почтовый сервер недоступен: {error}')
+            else:
+                try:
+                    sent, failed = self.drain(
+                        connection, options['batch_size'],
+                        options['max_attempts']
+                    )
+                finally:
+                    connection.close()
+                if sent or failed or not options['loop']:
+                    self.stdout.write(
+                        f'Отправлено писем: {sent}, с ошибкой: {failed}.'
+                    )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
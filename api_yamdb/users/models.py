@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from users import validators
 
@@ -31,6 +32,9 @@ class CustomUser(AbstractUser):
         choices=ROLE_CHOICES, default=USER
     )
     bio = models.TextField(verbose_name='О себе', blank=True)
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токена', default=0, editable=False
+    )
 
     @property
     def is_admin(self):
@@ -47,3 +51,58 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox)."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    )
+
+    subject = models.CharField(verbose_name='Тема', max_length=256)
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(verbose_name='Отправитель')
+    recipient = models.EmailField(
+        verbose_name='Получатель', max_length=settings.EMAIL_MAX_LENGTH
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки', default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка', default=timezone.now
+    )
+    lock_id = models.UUIDField(
+        verbose_name='Захвачено обработчиком', null=True, blank=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки', null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='email_status_next_attempt_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,90 @@
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+# Задержка перед повторной отправкой удваивается с каждой попыткой.
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 60 * 60
+# Через сколько секунд письма упавшего обработчика снова попадут в очередь.
+LOCK_TIMEOUT = 5 * 60
+
+SEND_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def enqueue(subject, body, from_email, recipient):
+    """
+    Ставит письмо в очередь. Вызывается в транзакции, создающей данные
+    для письма, поэтому письмо не уйдет при откате транзакции.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email,
+        recipient=recipient
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Захватывает пачку писем, готовых к отправке. Захват - условный UPDATE
+    с уникальным lock_id: параллельный обработчик не получит те же письма.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+    )
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    lock_id = uuid.uuid4()
+    due.filter(pk__in=ids).update(
+        lock_id=lock_id, next_attempt_at=now + timedelta(seconds=LOCK_TIMEOUT)
+    )
+    return list(OutgoingEmail.objects.filter(lock_id=lock_id))
+
+
+def send_batch(emails, connection, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Отправляет письма через одно соединение и одним запросом сохраняет
+    результат. Неудачные письма получают повторную попытку с экспоненциальной
+    задержкой, после max_attempts попыток - статус dead.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    sent = 0
+    for email in emails:
+        message = EmailMessage(
+            email.subject, email.body, email.from_email, [email.recipient],
+            connection=connection
+        )
+        email.lock_id = None
+        try:
+            message.send()
+        except SEND_ERRORS as error:
+            email.attempts += 1
+            email.last_error = str(error) or repr(error)
+            if email.attempts >= max_attempts:
+                email.status = OutgoingEmail.DEAD
+            else:
+                email.next_attempt_at = (
+                    timezone.now() + retry_delay(email.attempts)
+                )
+        else:
+            email.status = OutgoingEmail.SENT
+            email.sent_at = timezone.now()
+            sent += 1
+    OutgoingEmail.objects.bulk_update(emails, (
+        'status', 'attempts', 'next_attempt_at', 'lock_id', 'last_error',
+        'sent_at',
+    ))
+    return sent, len(emails) - sent
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import CustomUser
+from users.tokens import CLAIM_FIELDS, forget_token_version
+
+
+@receiver(pre_save, sender=CustomUser)
+def remember_claims(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает значения полей из токена до изменения пользователя."""
+    instance._previous_claims = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        CLAIM_FIELDS
+    ):
+        return
+    instance._previous_claims = sender.objects.filter(
+        pk=instance.pk
+    ).values_list(*CLAIM_FIELDS).first()
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_token_version(sender, instance, created, raw, **kwargs):
+    """
+    Увеличивает версию токена, если изменились роль, флаги или имя
+    пользователя. Версия обновляется отдельным UPDATE, поэтому изменение
+    не теряется при сохранении с update_fields.
+    """
+    previous = getattr(instance, '_previous_claims', None)
+    if raw or created or previous is None:
+        return
+    current = tuple(getattr(instance, field) for field in CLAIM_FIELDS)
+    if current == previous:
+        return
+    sender.objects.filter(pk=instance.pk).update(
+        token_version=F('token_version') + 1
+    )
+    instance.refresh_from_db(fields=('token_version',))
+    transaction.on_commit(lambda: forget_token_version(instance.pk))
+
+
+@receiver(post_delete, sender=CustomUser)
+def forget_deleted_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_token_version(user_id))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+# Поля пользователя, которые попадают в access-токен. Их изменение
+# увеличивает версию токена и делает выданные ранее токены недействительными.
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser', 'is_active')
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(user_id):
+    return f'users:token-version:{user_id}'
+
+
+def get_token_version(user_id):
+    """
+    Возвращает текущую версию токена активного пользователя или None,
+    если пользователь удален или заблокирован. Версия берется из кэша,
+    к БД запрос выполняется только при промахе.
+    """
+    cache = get_cache()
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_user_model().objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    get_cache().delete(version_key(user_id))
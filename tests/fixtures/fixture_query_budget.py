@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Превышение бюджета запросов к БД или N+1 валит тест."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture
+def query_recorder():
+    """Запросы к БД внутри теста с формами для поиска N+1."""
+    from api.querybudget import QueryRecorder
+
+    with QueryRecorder() as recorder:
+        yield recorder
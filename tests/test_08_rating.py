@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`.'
+        )
+
+        create_single_review(user_client, title_id, 'text', 4)
+        review = create_single_review(moderator_client, title_id, 'text', 8)
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг обновляется при создании отзыва.'
+        )
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review.json()['id']
+        )
+        moderator_client.patch(url, data={'score': 10})
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг обновляется при изменении оценки.'
+        )
+
+        moderator_client.delete(url)
+        assert self.get_rating(client, title_id) == 4, (
+            'Проверьте, что рейтинг обновляется при удалении отзыва.'
+        )
+
+    def test_02_rating_cascade_delete(self, admin_client, user_client, user,
+                                      client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 9)
+        create_single_review(admin_client, title_id, 'text', 3)
+
+        user.delete()
+        assert self.get_rating(client, title_id) == 3, (
+            'Проверьте, что рейтинг обновляется при каскадном удалении '
+            'отзывов.'
+        )
+
+    def test_03_rebuild_ratings(self, admin_client, user_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 5)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            5, 1, 5
+        ), 'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг.'
+
+    def test_04_title_update_keeps_rating(self, admin_client, user, client,
+                                          monkeypatch, settings):
+        from api.views import TitleViewSet
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        get_object = TitleViewSet.get_object
+
+        def get_object_then_review(view):
+            title = get_object(view)
+            Review.objects.create(
+                title_id=title.pk, author=user, text='text', score=8
+            )
+            return title
+
+        # Отзыв создается внутри запроса и не входит в его бюджет.
+        settings.QUERY_BUDGET_STRICT = False
+        monkeypatch.setattr(TitleViewSet, 'get_object', get_object_then_review)
+        response = admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            data={'name': 'Новое название'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        monkeypatch.undo()
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.name, title.rating_sum, title.rating_count) == (
+            'Новое название', 8, 1
+        ), (
+            'Проверьте, что изменение произведения не перезаписывает '
+            'рейтинг, обновленный отзывом после загрузки произведения.'
+        )
+        assert self.get_rating(client, title_id) == 8
+
+    def test_05_cascade_delete_through_api(self, admin_client, user_client,
+                                           user, client, query_recorder):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'text', 9)
+            create_single_review(admin_client, title['id'], 'text', 3)
+
+        def rating_updates(start):
+            return [
+                sql for sql, _ in query_recorder.queries[start:]
+                if sql.startswith('UPDATE "reviews_title"')
+            ]
+
+        start = len(query_recorder.queries)
+        admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert rating_updates(start) == [], (
+            'Проверьте, что при удалении произведения рейтинг не '
+            'обновляется для каждого его отзыва.'
+        )
+
+        start = len(query_recorder.queries)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert len(rating_updates(start)) == 1, (
+            'Проверьте, что после удаления пользователя рейтинг '
+            'произведений с его отзывами пересчитывается одним запросом.'
+        )
+        assert self.get_rating(client, titles[1]['id']) == 3
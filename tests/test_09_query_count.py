@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+
+def create_titles_in_bulk(count):
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(3)
+    )
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(count)
+    )
+    genres = list(Genre.objects.all())
+    titles = list(Title.objects.all())
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=title, genre=genre)
+        for title in titles for genre in genres
+    )
+    return titles
+
+
+def count_queries(client, url):
+    from api.cache import get_cache
+
+    # Считаются запросы некэшированного ответа.
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_title_list_constant_queries(self, client, monkeypatch):
+        create_titles_in_bulk(500)
+
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 5)
+        small_page_queries, data = count_queries(client, self.TITLES_URL)
+        assert len(data['results']) == 5
+
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 500)
+        large_page_queries, data = count_queries(client, self.TITLES_URL)
+        assert len(data['results']) == 500
+        assert len(data['results'][0]['genre']) == 3
+
+        assert small_page_queries == large_page_queries, (
+            f'Проверьте, что количество запросов к БД для `{self.TITLES_URL}` '
+            'не зависит от количества произведений на странице: '
+            f'{small_page_queries} запросов для 5 произведений и '
+            f'{large_page_queries} для 500.'
+        )
+
+    def test_02_title_detail_queries(self, client):
+        titles = create_titles_in_bulk(1)
+
+        queries, data = count_queries(
+            client,
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0].id)
+        )
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        # Три агрегатных запроса для ETag: произведения, категории, жанры.
+        assert queries <= 2 + 3, (
+            'Проверьте, что для получения произведения категория '
+            'загружается через JOIN, а жанры одним дополнительным запросом.'
+        )
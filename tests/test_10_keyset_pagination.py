@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import check_pagination, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_comments(self, admin_client, admin, count):
+        from reviews.models import Comment
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        review_id = reviews[0]['id']
+        comment = Comment.objects.create(
+            review_id=review_id, author=admin, text='comment 0'
+        )
+        # Одинаковая дата у всех комментариев проверяет разбор по `id`.
+        Comment.objects.bulk_create(
+            Comment(
+                review_id=review_id, author=admin, text=f'comment {idx}',
+                pub_date=comment.pub_date
+            )
+            for idx in range(1, count)
+        )
+        return self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review_id
+        )
+
+    def walk(self, client, url, link):
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчет '
+                'общего количества объектов.'
+            )
+            ids.append([comment['id'] for comment in data['results']])
+            url = data[link]
+            pages += 1
+        return ids, pages
+
+    def test_01_cursor_walks_all_pages(self, admin_client, admin, client):
+        from reviews.models import Comment
+
+        url = self.create_comments(admin_client, admin, 12)
+        expected = list(Comment.objects.order_by('id').values_list(
+            'id', flat=True
+        ))
+
+        pages, count = self.walk(client, f'{url}?pagination=cursor', 'next')
+        assert count == 3
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация возвращает все комментарии '
+            'по порядку (pub_date, id) без пропусков и повторов.'
+        )
+
+        last_page = client.get(f'{url}?pagination=cursor').json()
+        last_page = client.get(last_page['next']).json()
+        last_page = client.get(last_page['next']).json()
+        back_pages, _ = self.walk(client, last_page['previous'], 'previous')
+        assert sum(reversed(back_pages), []) == expected[:10], (
+            'Проверьте, что ссылка `previous` в режиме курсора ведет на '
+            'предыдущие страницы.'
+        )
+
+    def test_02_invalid_cursor(self, admin_client, admin, client):
+        url = self.create_comments(admin_client, admin, 1)
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_page_number_still_works(self, admin_client, admin, client):
+        url = self.create_comments(admin_client, admin, 3)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        check_pagination(url, response.json(), 3)
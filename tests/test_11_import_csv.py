@@ -0,0 +1,116 @@
+import csv
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_csv_rows(name):
+    with open(os.path.join(DATA_PATH, f'{name}.csv'), encoding='utf-8') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCsv:
+
+    def test_01_import_all_tables(self, django_user_model):
+        from reviews.models import Comment, Review, Title, TitleGenre
+
+        call_command('import_csv', batch_size=7, jobs=2, verbosity=0)
+
+        for name, model in (
+            ('users', django_user_model), ('titles', Title),
+            ('genre_title', TitleGenre), ('review', Review),
+            ('comments', Comment),
+        ):
+            assert model.objects.count() == count_csv_rows(name), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{name}.csv`.'
+            )
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `import_csv` сохраняет `pub_date` из CSV.'
+        )
+        assert Title.objects.get(pk=review.title_id).rating_count > 0, (
+            'Проверьте, что после загрузки отзывов рейтинг пересчитывается.'
+        )
+
+    def test_02_detect_encoding_from_prefix(self, tmp_path):
+        from reviews.csv_import import detect_encoding
+
+        file_path = tmp_path / 'genre.csv'
+        file_path.write_bytes(
+            'id,name,slug\n'.encode('utf-8')
+            + ('1,Драма,drama\n' * 500).encode('cp1251')
+        )
+        assert detect_encoding(file_path, sniff_bytes=4096) == 'windows-1251'
+
+    def test_03_dependency_graph(self):
+        from reviews.csv_import import CSV_TABLES, get_dependencies
+
+        dependencies = get_dependencies(CSV_TABLES)
+        assert dependencies['users'] == set()
+        assert dependencies['category'] == set()
+        assert dependencies['genre'] == set()
+        assert dependencies['titles'] == {'category'}
+        assert dependencies['genre_title'] == {'titles', 'genre'}
+        assert dependencies['review'] == {'titles', 'users'}
+        assert dependencies['comments'] == {'review', 'users'}
+
+    def test_04_consistency_check(self):
+        with pytest.raises(CommandError, match='invalid foreign key'):
+            call_command('import_csv', 'titles', jobs=1, verbosity=0)
+
+    def test_05_upsert_only_touches_delta(self, tmp_path):
+        from reviews.models import Genre
+
+        call_command('import_csv', 'genre', verbosity=0)
+        with open(os.path.join(DATA_PATH, 'genre.csv'), encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        rows[0]['name'] = 'Новое название'
+        rows.append({'id': '1000', 'name': 'Новый жанр', 'slug': 'new'})
+        with open(tmp_path / 'genre.csv', 'w', encoding='utf-8',
+                  newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=('id', 'name', 'slug'))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        call_command(
+            'import_csv', 'genre', path=tmp_path, mode='upsert', verbosity=0
+        )
+        assert Genre.objects.count() == len(rows)
+        assert Genre.objects.get(pk=rows[0]['id']).name == 'Новое название'
+        assert Genre.objects.get(pk=1000).slug == 'new'
+
+    def test_06_resume_from_checkpoint(self):
+        from pathlib import Path
+
+        from reviews import csv_import
+        from reviews.models import ImportCheckpoint, Review
+
+        tables = [csv_import.get_table(name) for name in (
+            'users', 'category', 'titles', 'review'
+        )]
+
+        def interrupt(name, rows, seconds):
+            if name == 'review':
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            csv_import.import_tables(
+                tables, Path(DATA_PATH), batch_size=10, progress=interrupt
+            )
+        checkpoint = ImportCheckpoint.objects.get(table='review')
+        assert (Review.objects.count(), checkpoint.records) == (10, 10)
+        assert 0 < checkpoint.offset < checkpoint.file_size
+
+        call_command('import_csv', batch_size=10, verbosity=0)
+        assert Review.objects.count() == count_csv_rows('review'), (
+            'Проверьте, что прерванная загрузка продолжается с контрольной '
+            'точки без повторной вставки строк.'
+        )
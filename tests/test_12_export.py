@@ -0,0 +1,85 @@
+import csv
+import gzip
+import io
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def read_csv_rows(file):
+    return sorted(
+        tuple(row.items()) for row in csv.DictReader(file)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{table}/'
+
+    def test_01_export_matches_import_layout(self, tmp_path):
+        call_command('import_csv', jobs=1, verbosity=0)
+        call_command('export_data', output=tmp_path, verbosity=0)
+
+        for name in (
+            'users', 'category', 'genre', 'titles', 'genre_title', 'review',
+            'comments'
+        ):
+            with open(os.path.join(DATA_PATH, f'{name}.csv'),
+                      encoding='utf-8', newline='') as source:
+                expected = read_csv_rows(source)
+            with open(tmp_path / f'{name}.csv', encoding='utf-8',
+                      newline='') as exported:
+                assert read_csv_rows(exported) == expected, (
+                    'Проверьте, что команда `export_data` выгружает файл '
+                    f'`{name}.csv` в том же формате, что и static/data.'
+                )
+
+    def test_02_export_ndjson_gzip(self, tmp_path):
+        call_command('import_csv', 'category', jobs=1, verbosity=0)
+        call_command(
+            'export_data', 'category', output=tmp_path, output_format='ndjson',
+            gzip=True, chunk_size=1, verbosity=0
+        )
+        with gzip.open(tmp_path / 'category.ndjson.gz', 'rt',
+                       encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        assert rows[0] == {'id': 1, 'name': 'Фильм', 'slug': 'movie'}
+        assert len(rows) == 3
+
+    def test_03_export_endpoint(self, admin_client, user_client, client):
+        call_command('import_csv', 'genre', jobs=1, verbosity=0)
+        url = self.EXPORT_URL_TEMPLATE.format(table='genre')
+
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что администратор может выгрузить `{url}`.'
+        )
+        content = b''.join(response.streaming_content).decode('utf-8')
+        with open(os.path.join(DATA_PATH, 'genre.csv'), encoding='utf-8',
+                  newline='') as source:
+            assert read_csv_rows(io.StringIO(content)) == read_csv_rows(
+                source
+            )
+
+        response = admin_client.get(url, {'output': 'ndjson', 'gzip': 1})
+        assert response['Content-Type'] == 'application/gzip'
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).decode('utf-8').splitlines()
+        assert json.loads(lines[0])['slug'] == 'drama'
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='unknown')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_repeated_get_is_cached(self, admin_client, client):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL, {'year': 1984})
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(self.TITLES_URL, {'year': 1984})
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json()
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что повторный GET-запрос к `/api/v1/titles/` '
+            'обслуживается из кэша без обращения к БД.'
+        )
+
+    def test_02_write_invalidates_cache(self, admin_client, user_client,
+                                        client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+
+        admin_client.patch(url, data={'name': 'Новое название'})
+        assert client.get(url).json()['name'] == 'Новое название'
+
+        count = client.get(self.GENRES_URL).json()['count']
+        admin_client.post(self.GENRES_URL, data={'name': 'Жанр', 'slug': 'g'})
+        assert client.get(self.GENRES_URL).json()['count'] == count + 1
+        genre_slugs = [
+            genre['slug'] for title in client.get(
+                self.TITLES_URL
+            ).json()['results'] for genre in title['genre']
+        ]
+        admin_client.delete(f'{self.GENRES_URL}{genre_slugs[0]}/')
+        assert genre_slugs[0] not in [
+            genre['slug'] for title in client.get(
+                self.TITLES_URL
+            ).json()['results'] for genre in title['genre']
+        ], 'Проверьте, что удаление жанра сбрасывает кэш произведений.'
+
+    def test_03_untouched_models_fast_delete(self, admin_client, client):
+        from django.db.models.deletion import Collector
+
+        from reviews.models import Genre, TitleGenre
+        from users.models import OutgoingEmail
+
+        collector = Collector(using='default')
+        for model in (TitleGenre, OutgoingEmail):
+            assert collector.can_fast_delete(model.objects.all()), (
+                'Проверьте, что сброс кэша не подключает получатели '
+                f'удаления к модели `{model.__name__}`.'
+            )
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        client.get(url)
+        genre = Genre.objects.get(slug=titles[0]['genre'][0])
+        with CaptureQueriesContext(connection) as context:
+            genre.delete()
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'reviews_titlegenre' in query['sql']
+        ], 'Проверьте, что связи с жанром удаляются без загрузки строк.'
+
+        slugs = titles[1]['genre']
+        admin_client.patch(url, data={'genre': slugs})
+        assert [
+            genre['slug'] for genre in client.get(url).json()['genre']
+        ] == slugs, (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
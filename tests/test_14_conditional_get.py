@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+        )
+        assert response.has_header('Last-Modified')
+
+        with CaptureQueriesContext(connection) as context:
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с If-None-Match, '
+            'совпадающим с ETag, возвращает ответ со статусом 304.'
+        )
+        assert not_modified.content == b''
+        assert len(context.captured_queries) <= 4
+
+        response_by_date = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response_by_date.status_code == HTTPStatus.NOT_MODIFIED
+        return response['ETag']
+
+    def test_01_conditional_get(self, admin_client, admin, user_client,
+                                user, client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )
+        for url in (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}{title_id}/',
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            comments_url,
+        ):
+            self.check_not_modified(client, url)
+
+        etag = self.check_not_modified(client, comments_url)
+        admin_client.delete(f'{comments_url}{comments[1]["id"]}/')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления комментария ETag списка меняется.'
+        )
+
+    def test_02_nested_changes_change_etag(self, admin_client, client):
+        _, categories, _ = create_titles(admin_client)
+        etag = client.get(self.TITLES_URL)['ETag']
+        admin_client.delete(f'/api/v1/categories/{categories[1]["slug"]}/')
+        assert client.get(
+            self.TITLES_URL, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK
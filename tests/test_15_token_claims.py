@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_claims_client(client, user):
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.CREATED
+    claims_client = APIClient()
+    claims_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+    )
+    return claims_client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'users_customuser' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TokenClaims:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    USERS_ME_URL = '/api/v1/users/me/'
+
+    def test_01_no_user_query(self, client, admin):
+        admin_client = get_claims_client(client, admin)
+        admin_client.get(self.CATEGORIES_URL)
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                self.CATEGORIES_URL, data={'name': 'Книга', 'slug': 'book'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert user_queries(context) == [], (
+            'Проверьте, что при аутентификации по токену с ролью '
+            'пользователь не загружается из БД.'
+        )
+
+        response = admin_client.get(self.USERS_ME_URL)
+        assert response.json()['email'] == admin.email
+
+    def test_02_role_change_invalidates_token(self, client, admin, user):
+        user_client = get_claims_client(client, user)
+        data = {'name': 'Книга', 'slug': 'book'}
+        assert user_client.post(
+            self.CATEGORIES_URL, data=data
+        ).status_code == HTTPStatus.FORBIDDEN
+
+        admin_client = get_claims_client(client, admin)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert user_client.get(
+            self.USERS_ME_URL
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли старый токен отклоняется.'
+        )
+
+        user.refresh_from_db()
+        new_client = get_claims_client(client, user)
+        assert new_client.post(
+            self.CATEGORIES_URL, data=data
+        ).status_code == HTTPStatus.CREATED
+
+    def test_03_author_permissions(self, client, admin, user, moderator):
+        admin_client = get_claims_client(client, admin)
+        user_client = get_claims_client(client, user)
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 5
+        ).json()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+
+        assert user_client.patch(
+            url, data={'text': 'new'}
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+        moderator_client = get_claims_client(client, moderator)
+        assert moderator_client.delete(url).status_code == (
+            HTTPStatus.NO_CONTENT
+        )
+
+    def test_04_users_me_returns_saved_values(self, client, user):
+        user_client = get_claims_client(client, user)
+        response = user_client.patch(
+            self.USERS_ME_URL, data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == 'renamed', (
+            'Проверьте, что users/me/ возвращает сохраненное имя, '
+            'а не имя из токена.'
+        )
+        user.refresh_from_db()
+        assert user.username == 'renamed'
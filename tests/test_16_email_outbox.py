@@ -0,0 +1,84 @@
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, number):
+        client.post(self.URL_SIGNUP, data={
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        })
+
+    def test_01_signup_queues_email(self, client):
+        for number in range(3):
+            self.signup(client, number)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что эндпоинт регистрации не отправляет письмо сам, '
+            'а ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING
+        ).count() == 3
+
+        call_command('send_queued_emails', batch_size=2, verbosity=0)
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{number}@yamdb.fake' for number in range(3)
+        ]
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+
+        call_command('send_queued_emails', verbosity=0)
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_and_dead_letter(self, client, monkeypatch):
+        self.signup(client, 1)
+
+        def fail(self, messages):
+            raise smtplib.SMTPRecipientsRefused({})
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', fail)
+        call_command('send_queued_emails', max_attempts=2, verbosity=0)
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_queued_emails', max_attempts=2, verbosity=0)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.DEAD, (
+            'Проверьте, что после max_attempts попыток письмо получает '
+            'статус dead.'
+        )
+        assert email.lock_id is None
+
+    def test_03_signup_transaction_starts_with_write(self, client,
+                                                     query_recorder):
+        for attempt in ('new', 'existing'):
+            start = len(query_recorder.queries)
+            self.signup(client, 1)
+            queries = [sql for sql, _ in query_recorder.queries[start:]]
+            begin = queries.index('BEGIN')
+            assert queries[begin + 1].startswith('INSERT'), (
+                'Проверьте, что транзакция регистрации начинается с записи, '
+                f'а не с чтения ({attempt} пользователь): иначе '
+                'параллельные регистрации в SQLite падают с '
+                '`database is locked`.'
+            )
+        assert OutgoingEmail.objects.count() == 2
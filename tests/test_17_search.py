@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Search:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    SEARCH_URL = '/api/v1/search/'
+
+    def test_01_titles_search_ranked(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'description': 'Легендарная космическая опера'}
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/',
+            data={'name': 'Космос', 'description': 'Документальный'}
+        )
+
+        response = client.get(self.TITLES_URL, {'search': 'космич'})
+        assert response.status_code == HTTPStatus.OK
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], 'Проверьте, что `?search=` ищет слова по префиксу.'
+
+        response = client.get(self.TITLES_URL, {'search': 'косм'})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            'Проверьте, что совпадение в названии произведения ранжируется '
+            'выше совпадения в описании.'
+        )
+
+        admin_client.delete(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        response = client.get(self.TITLES_URL, {'search': 'косм'})
+        assert response.json()['count'] == 1
+
+    def test_02_global_search(self, admin_client, user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отличная экранизация', 9
+        ).json()
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        response = client.get(reviews_url, {'search': 'экранизация'})
+        assert [item['id'] for item in response.json()['results']] == [
+            review['id']
+        ]
+        assert client.get(
+            reviews_url, {'search': 'спектакль'}
+        ).json()['results'] == []
+
+        response = client.get(self.SEARCH_URL, {'search': 'экранизац'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.SEARCH_URL}` доступен.'
+        )
+        results = response.json()['results']
+        assert [(item['type'], item['data']['id']) for item in results] == [
+            ('review', review['id'])
+        ]
+        assert results[0]['url'].endswith(f'{reviews_url}{review["id"]}/')
+
+        assert client.get(
+            self.SEARCH_URL, {'search': 'x', 'limit': 0}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_rebuild_after_import(self, client):
+        call_command('import_csv', 'category', 'genre', 'titles', jobs=1,
+                     verbosity=0)
+        response = client.get(self.TITLES_URL, {'search': 'Шоушенка'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что после загрузки CSV поисковый индекс '
+            'перестраивается.'
+        )
+
+    def test_04_cascade_delete_batches_index(self, admin_client, user_client,
+                                             moderator_client, client,
+                                             query_recorder):
+        from django.db import connection
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for author_client in (admin_client, user_client, moderator_client):
+            review = create_single_review(
+                author_client, title_id, 'Экранизация', 7
+            ).json()
+            for _ in range(3):
+                create_single_comment(
+                    author_client, title_id, review['id'], 'Экранизация'
+                )
+
+        start = len(query_recorder.queries)
+        admin_client.delete(f'{self.TITLES_URL}{title_id}/')
+        index_deletes = [
+            sql for sql, _ in query_recorder.queries[start:]
+            if sql.startswith('DELETE FROM search_')
+        ]
+        assert len(index_deletes) == 3, (
+            'Проверьте, что при каскадном удалении записи поискового '
+            'индекса удаляются одним запросом на модель.'
+        )
+        with connection.cursor() as cursor:
+            for table in ('search_title', 'search_review', 'search_comment'):
+                cursor.execute(f'SELECT COUNT(*) FROM {table}')
+                assert cursor.fetchone()[0] == (table == 'search_title')
+        assert client.get(
+            self.SEARCH_URL, {'search': 'экранизация'}
+        ).json()['results'] == []
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Autocomplete:
+
+    TITLES_URL = '/api/v1/titles/'
+    AUTOCOMPLETE_URL = '/api/v1/titles/autocomplete/'
+
+    def names(self, client, query, **params):
+        response = client.get(self.AUTOCOMPLETE_URL, {'q': query, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.AUTOCOMPLETE_URL}` доступен.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_prefix_lookup(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'name': 'Ёжик в тумане'}
+        )
+        assert self.names(client, 'ЕЖИ') == ['Ёжик в тумане'], (
+            'Проверьте, что поиск подсказок не зависит от регистра и '
+            'буквы ё.'
+        )
+        assert self.names(client, 'тум') == ['Ёжик в тумане'], (
+            'Проверьте, что подсказки ищутся по началу любого слова.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self.names(client, 'еж')
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что подсказки строятся без запросов к БД.'
+        )
+
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Ежевичная зима', 'year': 2000,
+            'genre': [genres[0]['slug']], 'category': categories[0]['slug'],
+        })
+        assert set(self.names(client, 'еж')) == {
+            'Ежевичная зима', 'Ёжик в тумане'
+        }
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert self.names(client, 'еж') == ['Ежевичная зима']
+        assert self.names(client, '') == []
+
+    def test_02_ranked_by_rating(self, admin_client, user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        for title, name in zip(titles, ('Мастер', 'Маска')):
+            admin_client.patch(
+                f'{self.TITLES_URL}{title["id"]}/', data={'name': name}
+            )
+        create_single_review(user_client, titles[0]['id'], 'text', 3)
+        create_single_review(user_client, titles[1]['id'], 'text', 8)
+        assert self.names(client, 'ма') == ['Маска', 'Мастер'], (
+            'Проверьте, что подсказки упорядочены по рейтингу.'
+        )
+        assert self.names(client, 'ма', limit=1) == ['Маска']
+        assert client.get(
+            self.AUTOCOMPLETE_URL, {'q': 'ма', 'limit': 0}
+        ).status_code == HTTPStatus.BAD_REQUEST
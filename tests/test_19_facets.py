@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Facets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_facet_counts(self, admin_client, client):
+        _, categories, _ = create_titles(admin_client)
+        response = client.get(
+            self.TITLES_URL, {'facets': 'genre,category,year'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        facets = response.json().get('facets')
+        assert facets is not None, (
+            'Проверьте, что параметр `?facets=` добавляет в ответ счетчики.'
+        )
+        assert {
+            genre['slug']: genre['count'] for genre in facets['genre']
+        } == {'horror': 1, 'comedy': 1, 'drama': 1}
+        assert {
+            category['slug']: category['count']
+            for category in facets['category']
+        } == {categories[0]['slug']: 1, categories[1]['slug']: 1}
+        assert facets['year'] == [
+            {'year': 1988, 'count': 1}, {'year': 1984, 'count': 1}
+        ]
+
+        response = client.get(
+            self.TITLES_URL, {'facets': 'genre', 'genre': 'horror'}
+        )
+        assert response.json()['facets']['genre'] == [
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+            {'slug': 'horror', 'name': 'Ужасы', 'count': 1},
+        ], 'Проверьте, что счетчики считаются по отфильтрованному списку.'
+
+        assert client.get(
+            self.TITLES_URL, {'facets': 'unknown'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_unfiltered_facets_cached(self, admin_client, client):
+        create_titles(admin_client)
+        params = {'facets': 'genre,category,year'}
+        client.get(self.TITLES_URL, params)
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.TITLES_URL, {**params, 'page': 1})
+        assert not any(
+            'GROUP BY' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что счетчики для списка без фильтров берутся '
+            'из кэша.'
+        )
+
+        admin_client.delete('/api/v1/genres/horror/')
+        genres = client.get(self.TITLES_URL, params).json()['facets']['genre']
+        assert 'horror' not in [genre['slug'] for genre in genres]
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_multi_value_and_range_filters(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.names(client, genre='horror,drama') == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте, что `?genre=` принимает несколько жанров через запятую.'
+        assert self.names(client, genre='horror,comedy') == ['Терминатор'], (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'не дублируется.'
+        )
+        assert self.names(
+            client, genre='horror,comedy', genre_match='all'
+        ) == ['Терминатор']
+        assert self.names(
+            client, genre='horror,drama', genre_match='all'
+        ) == []
+        assert self.names(client, year_min=1985) == ['Крепкий орешек']
+        assert self.names(client, year_max=1985) == ['Терминатор']
+        assert self.names(client, year_min=1984, year_max=1988) == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.names(client, name_prefix='Креп') == ['Крепкий орешек']
+        assert self.names(client, name='Терминатор') == ['Терминатор']
+
+    @pytest.mark.parametrize('params', (
+        {'genre': 'horror,drama'},
+        {'genre': 'horror,drama', 'genre_match': 'all'},
+        {'category': 'movie'},
+        {'year': 1984},
+        {'year_min': 1980, 'year_max': 1990},
+        {'name': 'Терминатор'},
+        {'name_prefix': 'Тер'},
+        {'genre': 'horror', 'year_min': 1980},
+        {'category': 'movie', 'name_prefix': 'Тер'},
+    ))
+    def test_02_filters_use_indexes(self, params):
+        queryset = TitleFilter(params, queryset=Title.objects.all()).qs
+        plan = query_plan(queryset)
+        full_scans = [
+            step for step in plan
+            if step.startswith('SCAN') and 'INDEX' not in step
+        ]
+        assert not full_scans, (
+            f'Проверьте, что фильтр {params} использует индекс. '
+            f'План запроса: {plan}'
+        )
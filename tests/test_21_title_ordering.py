@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api.filters import TitleFilter
+from reviews.models import Title, TitleGenre
+from tests.test_20_title_filter import query_plan
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def ids(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_ordering(self, admin_client, user_client, moderator_client,
+                         client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'text', 4)
+        create_single_review(moderator_client, first, 'text', 6)
+        create_single_review(user_client, second, 'text', 9)
+
+        assert self.ids(client, ordering='-rating') == [second, first], (
+            'Проверьте, что `?ordering=-rating` сортирует произведения '
+            'по убыванию рейтинга.'
+        )
+        assert self.ids(client, ordering='-review_count') == [first, second]
+        assert self.ids(client, ordering='-year') == [second, first]
+        assert self.ids(client, ordering='name') == [second, first]
+        assert self.ids(client) == [first, second]
+        assert self.ids(
+            client, genre='drama', ordering='-rating'
+        ) == [second]
+        assert client.get(
+            self.TITLES_URL, {'ordering': 'description'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_genre_rating_copy(self, admin_client, user_client):
+        titles, _, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        assert set(TitleGenre.objects.filter(
+            title_id=titles[0]['id']
+        ).values_list('rating', flat=True)) == {7}, (
+            'Проверьте, что рейтинг произведения копируется в связи '
+            'с жанрами.'
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'genre': [genres[2]['slug']]}
+        )
+        assert list(TitleGenre.objects.filter(
+            title_id=titles[0]['id']
+        ).values_list('rating', flat=True)) == [7]
+
+        TitleGenre.objects.update(rating=None)
+        call_command('rebuild_ratings', verbosity=0)
+        assert TitleGenre.objects.filter(rating=7).count() == 1
+
+    def test_03_top_in_genre_uses_index(self):
+        queryset = TitleFilter(
+            {'genre': 'drama', 'ordering': '-rating'},
+            queryset=Title.objects.all()
+        ).qs[:100]
+        plan = query_plan(queryset)
+        assert any('titlegenre_genre_rating_idx' in step for step in plan)
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что лучшие произведения жанра выбираются по индексу '
+            f'без сортировки. План запроса: {plan}'
+        )
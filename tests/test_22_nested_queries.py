@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+
+def create_review_thread(count):
+    from django.contrib.auth import get_user_model
+    from reviews.models import Category, Comment, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    titles = [
+        Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Первое', 'Второе')
+    ]
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(count)
+    )
+    users = list(User.objects.all())
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=5
+        )
+        for author in users
+    ]
+    Comment.objects.bulk_create(
+        Comment(review=reviews[0], author=author, text='Комментарий')
+        for author in users
+    )
+    return titles, reviews
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NestedQueries:
+
+    REVIEWS_URL = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    @pytest.mark.parametrize('url', (REVIEWS_URL, COMMENTS_URL))
+    def test_01_constant_queries(self, client, monkeypatch, url):
+        titles, reviews = create_review_thread(30)
+        url = url.format(title_id=titles[0].id, review_id=reviews[0].id)
+
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 3)
+        small_page_queries, data = count_queries(client, url)
+        assert len(data['results']) == 3
+
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 30)
+        large_page_queries, data = count_queries(client, url)
+        assert len(data['results']) == 30
+        assert data['results'][0]['author'].startswith('user')
+
+        assert small_page_queries == large_page_queries <= 3, (
+            f'Проверьте, что для `{url}` родитель и страница с авторами '
+            'выбираются постоянным числом запросов к БД.'
+        )
+
+        cursor_queries, data = count_queries(client, url + '?cursor=')
+        assert cursor_queries <= 2, (
+            f'Проверьте, что в режиме курсора `{url}` не проверяет '
+            'родителя отдельным запросом.'
+        )
+
+    def test_02_detail_single_query(self, client):
+        titles, reviews = create_review_thread(2)
+        url = self.REVIEWS_URL.format(title_id=titles[0].id)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}{reviews[0].id}/')
+        assert response.status_code == HTTPStatus.OK
+        # Агрегат для ETag и сам отзыв с автором.
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что отзыв выбирается вместе с автором и проверкой '
+            'произведения, без отдельного запроса произведения.'
+        )
+
+    def test_03_review_from_other_title(self, client, user_client):
+        from reviews.models import Comment
+
+        titles, reviews = create_review_thread(2)
+        url = self.COMMENTS_URL.format(
+            title_id=titles[1].id, review_id=reviews[0].id
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва не выдаются по адресу '
+            'с чужим произведением.'
+        )
+        comment_id = Comment.objects.filter(review=reviews[0]).first().id
+        assert client.get(
+            f'{url}{comment_id}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.post(
+            url, data={'text': 'Комментарий'}
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нельзя оставить комментарий к отзыву по адресу '
+            'с чужим произведением.'
+        )
+
+    def test_04_empty_and_missing_parent(self, client):
+        titles, reviews = create_review_thread(2)
+        response = client.get(self.REVIEWS_URL.format(title_id=titles[1].id))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+        response = client.get(self.COMMENTS_URL.format(
+            title_id=titles[0].id, review_id=reviews[1].id
+        ))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == []
+
+        assert client.get(
+            self.REVIEWS_URL.format(title_id=titles[1].id + 100)
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для несуществующего произведения список '
+            'отзывов возвращает 404.'
+        )
@@ -0,0 +1,148 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from tests.test_09_query_count import create_titles_in_bulk
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23QueryBudget:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_normalize_sql(self):
+        from api.querybudget import normalize_sql
+
+        assert normalize_sql(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a''b'"
+        ) == normalize_sql(
+            'SELECT *  FROM t WHERE id IN (%s) AND name = %s'
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = ?', (
+            'Проверьте, что значения и длина списков IN не влияют '
+            'на форму запроса.'
+        )
+        assert normalize_sql('SELECT * FROM t LIMIT 21') == (
+            'SELECT * FROM t LIMIT ?'
+        )
+
+    def test_02_budget_exceeded(self, client, monkeypatch, settings, caplog):
+        from api.querybudget import QueryBudgetExceeded
+        from api.views import TitleViewSet
+
+        create_titles_in_bulk(3)
+        monkeypatch.setitem(TitleViewSet.query_budget, 'list', 1)
+        with pytest.raises(QueryBudgetExceeded, match='бюджете 1'):
+            client.get(self.TITLES_URL)
+
+        settings.QUERY_BUDGET_STRICT = False
+        with caplog.at_level(logging.WARNING, logger='api.querybudget'):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что без QUERY_BUDGET_STRICT превышение бюджета '
+            'только записывается в лог.'
+        )
+        assert 'GET /api/v1/titles/' in caplog.text
+
+    def test_03_n_plus_one(self, client, monkeypatch):
+        from api.querybudget import QueryBudgetExceeded
+        from api.views import TitleViewSet
+        from reviews.models import Title
+
+        create_titles_in_bulk(5)
+        monkeypatch.setattr(
+            TitleViewSet, 'queryset',
+            Title.objects.select_related('category').order_by('id')
+        )
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            client.get(self.TITLES_URL)
+        assert 'N+1: 5 раз' in str(excinfo.value), (
+            'Проверьте, что повторяющиеся запросы жанров для каждого '
+            'произведения определяются как N+1.'
+        )
+
+    def test_04_title_create_genres(self, admin_client, query_recorder):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(10)
+        )
+        # Версия токена кэшируется первым запросом.
+        admin_client.get(self.TITLES_URL)
+        counts = []
+        for genres in (1, 10):
+            start = len(query_recorder.queries)
+            response = admin_client.post(self.TITLES_URL, data={
+                'name': f'Произведение {genres}', 'year': 2000,
+                'category': 'films',
+                'genre': [f'genre-{idx}' for idx in range(genres)],
+            })
+            assert response.status_code == HTTPStatus.CREATED
+            assert len(response.json()['genre']) == genres
+            counts.append(len(query_recorder.queries) - start)
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при создании произведения '
+            'не зависит от числа жанров.'
+        )
+
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Произведение', 'year': 2000, 'category': 'films',
+            'genre': ['genre-1', 'unknown'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
+
+    def test_05_users_me_budget_by_method(self, user_client):
+        from api.querybudget import get_query_budget
+        from api.views import UserViewSet
+
+        view = UserViewSet.as_view({'get': 'user_me', 'patch': 'user_me'})
+        assert get_query_budget(view, 'GET') == 3
+        assert get_query_budget(view, 'PATCH') == 7, (
+            'Проверьте, что для действия с несколькими методами бюджет '
+            'задается по методам.'
+        )
+
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed', 'bio': 'О себе'}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени через users/me/ укладывается '
+            'в бюджет запросов PATCH.'
+        )
+
+    def test_06_cascading_deletes(self, admin_client, user_client,
+                                  moderator_client, user):
+        from django.contrib.auth.models import Group
+
+        user.groups.add(Group.objects.create(name='Редакторы'))
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            for author_client in (admin_client, user_client,
+                                  moderator_client):
+                review = create_single_review(
+                    author_client, title['id'], 'text', 5
+                ).json()
+                for _ in range(3):
+                    create_single_comment(
+                        user_client, title['id'], review['id'], 'text'
+                    )
+        review_url = (
+            f'{self.TITLES_URL}{titles[1]["id"]}/reviews/{review["id"]}/'
+        )
+        for url in (
+            review_url,
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            f'/api/v1/users/{user.username}/',
+            '/api/v1/categories/books/',
+        ):
+            response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT, (
+                f'Проверьте, что каскадное удаление `{url}` укладывается '
+                'в бюджет запросов и не содержит N+1.'
+            )
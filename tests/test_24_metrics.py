@@ -0,0 +1,144 @@
+import re
+from http import HTTPStatus
+
+import pytest
+
+from tests.test_09_query_count import create_titles_in_bulk
+
+METRICS_TOKEN = 'scrape-token'
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    settings.METRICS_TOKEN = METRICS_TOKEN
+    return tmp_path
+
+
+def get_samples(client):
+    response = client.get(
+        '/metrics', HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            sample, value = line.rsplit(' ', 1)
+            samples[sample] = float(value)
+    return samples
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_request_metrics(self, client, metrics_dir):
+        create_titles_in_bulk(3)
+        for _ in range(2):
+            assert client.get(self.TITLES_URL).status_code == HTTPStatus.OK
+        client.get('/api/v1/titles/100500/')
+
+        samples = get_samples(client)
+        labels = 'method="GET",route="api:title-list"'
+        assert samples[
+            'http_requests_total{method="GET",route="api:title-list",'
+            'status="200"}'
+        ] == 2, (
+            'Проверьте, что ответы считаются по имени маршрута, методу '
+            'и статусу.'
+        )
+        assert samples[
+            'http_requests_total{method="GET",route="api:title-detail",'
+            'status="404"}'
+        ] == 1
+        assert samples[
+            f'http_request_duration_seconds_count{{{labels}}}'
+        ] == 2
+        assert samples[
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+        ] == 2
+        assert samples[f'http_request_db_queries_sum{{{labels}}}'] > 0, (
+            'Проверьте, что учитывается количество запросов к БД.'
+        )
+        assert samples[f'http_request_db_duration_seconds_sum{{{labels}}}']
+        assert samples[
+            f'http_request_serializer_duration_seconds_sum{{{labels}}}'
+        ] > 0, 'Проверьте, что учитывается время сериализации.'
+        assert samples[f'http_response_size_bytes_sum{{{labels}}}'] == (
+            2 * len(client.get(self.TITLES_URL).content)
+        )
+
+    def test_02_buckets_cumulative(self, client, metrics_dir):
+        client.get(self.TITLES_URL)
+        buckets = [
+            (float(bound.replace('+Inf', 'inf')), value)
+            for sample, value in get_samples(client).items()
+            for bound in re.findall(
+                r'^http_request_db_queries_bucket\{.*route="api:title-list"'
+                r'.*le="([^"]+)"\}$', sample
+            )
+        ]
+        values = [value for _, value in sorted(buckets)]
+        assert values == sorted(values) and values[-1] == 1, (
+            'Проверьте, что корзины гистограммы накопленные.'
+        )
+
+    def test_03_processes_aggregated(self, client, metrics_dir):
+        from api.metrics import REQUESTS, MmapValues, make_key
+
+        labels = {'route': 'api:title-list', 'method': 'GET', 'status': '200'}
+        other_process = MmapValues(metrics_dir / 'metrics_1.db')
+        other_process.add(make_key(REQUESTS, '', labels), 5)
+        # Файл должен расти, когда ключи не помещаются в начальный размер.
+        for idx in range(2000):
+            other_process.add(
+                make_key(REQUESTS, '', dict(labels, route=f'route-{idx}')), 1
+            )
+        other_process.close()
+
+        client.get(self.TITLES_URL)
+        samples = get_samples(client)
+        assert samples[
+            'http_requests_total{method="GET",route="api:title-list",'
+            'status="200"}'
+        ] == 6, (
+            'Проверьте, что /metrics суммирует значения всех процессов.'
+        )
+        assert samples[
+            'http_requests_total{method="GET",route="route-1999",'
+            'status="200"}'
+        ] == 1
+        reopened = MmapValues(metrics_dir / 'metrics_1.db')
+        reopened.add(make_key(REQUESTS, '', labels), 1)
+        reopened.close()
+        assert get_samples(client)[
+            'http_requests_total{method="GET",route="api:title-list",'
+            'status="200"}'
+        ] == 7, 'Проверьте, что значения сохраняются при открытии файла.'
+
+    def test_04_access(self, client, admin_client, user_client, settings,
+                       metrics_dir):
+        assert client.get('/metrics').status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что метрики недоступны анонимному пользователю.'
+        )
+        assert user_client.get('/metrics').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что метрики недоступны обычному пользователю.'
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong-token'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert admin_client.get('/metrics').status_code == HTTPStatus.OK, (
+            'Проверьте, что метрики доступны администратору.'
+        )
+        assert get_samples(client), (
+            'Проверьте, что метрики доступны сборщику с METRICS_TOKEN.'
+        )
+
+        settings.METRICS_TOKEN = ''
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer '
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что без METRICS_TOKEN доступ по токену отключен.'
+        )
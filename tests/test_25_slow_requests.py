@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.test_09_query_count import create_titles_in_bulk
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    settings.SLOW_REQUEST_SAMPLE_RATE = 0
+    settings.SLOW_REQUEST_LOG = str(tmp_path / 'slow.jsonl')
+    return tmp_path / 'slow.jsonl'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SlowRequests:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_entry(self, client, slow_log):
+        from api.slowlog import read_entries
+
+        create_titles_in_bulk(3)
+        response = client.get(self.TITLES_URL, {'genre': 'genre-1'})
+        assert response.status_code == HTTPStatus.OK
+
+        entry, = read_entries()
+        assert entry['route'] == 'api:title-list'
+        assert entry['params'] == {'genre': ['genre-1']}
+        assert entry['role'] == 'anonymous'
+        assert entry['status'] == HTTPStatus.OK
+        assert entry['query_count'] == len(entry['queries']) > 0
+        selects = [
+            query for query in entry['queries']
+            if query['sql'].startswith('SELECT')
+        ]
+        assert selects and all(query['plan'] for query in selects), (
+            'Проверьте, что для запросов SELECT сохраняется план.'
+        )
+        assert all(query['params'] is None for query in entry['queries']), (
+            'Проверьте, что по умолчанию параметры SQL-запросов не '
+            'сохраняются.'
+        )
+
+    def test_02_threshold_and_sampling(self, client, settings, slow_log):
+        from api.slowlog import read_entries
+
+        settings.SLOW_REQUEST_THRESHOLD = 60
+        client.get(self.TITLES_URL)
+        assert read_entries() == [], (
+            'Проверьте, что быстрые запросы не сохраняются.'
+        )
+        settings.SLOW_REQUEST_SAMPLE_RATE = 1
+        client.get(self.TITLES_URL)
+        assert len(read_entries()) == 1, (
+            'Проверьте, что запросы из случайной выборки сохраняются.'
+        )
+
+    def test_03_rotation(self, client, settings, slow_log):
+        from api.slowlog import read_entries
+
+        settings.SLOW_REQUEST_LOG_MAX_BYTES = 1
+        for page in range(1, 4):
+            client.get(self.TITLES_URL, {'page': page})
+        assert slow_log.with_name('slow.jsonl.1').exists()
+        entries = read_entries()
+        assert [entry['params']['page'] for entry in entries] == [
+            ['3'], ['2']
+        ], (
+            'Проверьте, что хранятся файл и одна резервная копия, '
+            'новые записи первыми.'
+        )
+
+    def test_04_admin_view(self, client, user_superuser, slow_log):
+        from api.slowlog import read_entries
+
+        client.get(self.TITLES_URL)
+        entry, = read_entries()
+        assert client.get(
+            '/admin/slow-requests/'
+        ).status_code == HTTPStatus.FOUND, (
+            'Проверьте, что список медленных запросов доступен только '
+            'персоналу.'
+        )
+
+        client.force_login(user_superuser)
+        assert '/admin/slow-requests/' in client.get(
+            '/admin/'
+        ).content.decode(), 'Проверьте, что на главной админки есть ссылка.'
+        response = client.get('/admin/slow-requests/')
+        assert response.status_code == HTTPStatus.OK
+        assert entry['id'] in response.content.decode()
+
+        response = client.get(f'/admin/slow-requests/{entry["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'reviews_title' in response.content.decode()
+        assert client.get(
+            '/admin/slow-requests/unknown/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_sensitive_params(self, client, settings, slow_log):
+        from api.slowlog import read_entries
+
+        email = 'secret@yamdb.fake'
+        client.post(
+            '/api/v1/auth/signup/', {'username': 'secret', 'email': email}
+        )
+        assert email not in slow_log.read_text(encoding='utf-8'), (
+            'Проверьте, что почта из параметров SQL-запросов не попадает '
+            'в лог медленных запросов.'
+        )
+        assert slow_log.stat().st_mode & 0o777 == 0o600, (
+            'Проверьте, что файл лога доступен только владельцу.'
+        )
+
+        settings.SLOW_REQUEST_LOG_PARAMS = True
+        client.get(self.TITLES_URL, {'genre': 'genre-1'})
+        entry = read_entries()[0]
+        assert any(
+            'genre-1' in (query['params'] or [])
+            for query in entry['queries']
+        ), 'Проверьте, что при SLOW_REQUEST_LOG_PARAMS параметры сохраняются.'
@@ -0,0 +1,80 @@
+import pytest
+
+SIZES = {
+    'users': 10, 'categories': 2, 'genres': 4, 'titles': 12,
+    'reviews': 40, 'comments': 60,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Benchmark:
+
+    def test_01_generate(self):
+        from reviews.datagen import generate
+        from reviews.models import Review, Title, TitleGenre
+
+        counts = generate(SIZES, seed=1)
+        assert counts == {**SIZES, 'genre_title': TitleGenre.objects.count()}
+        assert Review.objects.count() == 40
+        assert not Title.objects.filter(
+            rating_count__gt=0, rating__isnull=True
+        ).exists(), (
+            'Проверьте, что после генерации пересчитан рейтинг произведений.'
+        )
+        names = list(Title.objects.order_by('id').values_list(
+            'name', flat=True
+        ))
+        generate(SIZES, seed=1)
+        assert list(Title.objects.order_by('id').values_list(
+            'name', flat=True
+        ))[len(names):] == names, (
+            'Проверьте, что одинаковый seed дает одинаковые данные.'
+        )
+
+    @pytest.mark.parametrize('transport_class, mix, concurrency', (
+        ('WSGITransport', 'read', 2),
+        ('ASGITransport', 'mixed', 1),
+        ('WSGITransport', 'write', 1),
+    ))
+    def test_02_run(self, transport_class, mix, concurrency):
+        from api import benchmark
+        from reviews.datagen import generate
+
+        generate(SIZES)
+        transport = getattr(benchmark, transport_class)()
+        try:
+            seconds, latencies = benchmark.run(
+                transport, benchmark.BenchmarkContext(), mix, 30,
+                concurrency
+            )
+        finally:
+            transport.close()
+        report = benchmark.make_report(seconds, latencies, {})
+        assert report['total']['count'] >= 30
+        assert report['total']['errors'] == 0, (
+            'Проверьте, что сценарии нагрузочного теста выполняются '
+            'без ошибок.'
+        )
+        for summary in report['requests'].values():
+            assert summary['p50_ms'] <= summary['p95_ms'] <= summary[
+                'p99_ms'
+            ]
+
+    def test_03_compare(self):
+        from api.benchmark import compare, make_report
+
+        baseline = make_report(1, {'title_list': [(0.01, True)] * 10}, {})
+        report = make_report(1, {'title_list': [(0.02, True)] * 10}, {})
+        _, regressions = compare(baseline, report, 20)
+        assert 'title_list p95_ms: +100.0%' in regressions, (
+            'Проверьте, что рост p95 больше порога считается регрессией.'
+        )
+        assert compare(baseline, baseline, 20)[1] == []
+
+    def test_04_percentile(self):
+        from api.benchmark import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 95) == 7
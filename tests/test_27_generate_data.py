@@ -0,0 +1,115 @@
+import csv
+from collections import Counter
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import F
+
+SIZES = {
+    'users': 30, 'categories': 3, 'genres': 6, 'titles': 40,
+    'reviews': 400, 'comments': 600,
+}
+
+
+def read_csv(path, name):
+    with open(path / f'{name}.csv', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27GenerateData:
+
+    def test_01_insert(self, django_user_model):
+        from reviews.models import Comment, Review, Title
+
+        call_command('generate_data', seed=1, verbosity=0, **SIZES)
+        assert django_user_model.objects.count() == 30
+        assert Review.objects.count() == 400
+        assert Comment.objects.count() == 600
+        assert not Title.objects.filter(
+            rating_count__gt=0, rating__isnull=True
+        ).exists(), (
+            'Проверьте, что после генерации пересчитан рейтинг произведений.'
+        )
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), 'Проверьте, что комментарии написаны после отзывов.'
+        review = Review.objects.first()
+        assert review.updated_at is not None
+
+        call_command('generate_data', seed=1, verbosity=0, **SIZES)
+        assert Review.objects.count() == 800, (
+            'Проверьте, что повторная генерация добавляет данные после '
+            'существующих.'
+        )
+
+    def test_02_csv_is_reproducible_and_importable(self, tmp_path):
+        from reviews.models import Comment, Review
+
+        for name in ('first', 'second'):
+            call_command(
+                'generate_data', '--end-date', '2026-01-01', seed=5,
+                output=tmp_path / name, verbosity=0, **SIZES
+            )
+        for name in ('users', 'titles', 'genre_title', 'review', 'comments'):
+            assert (tmp_path / 'first' / f'{name}.csv').read_bytes() == (
+                tmp_path / 'second' / f'{name}.csv'
+            ).read_bytes(), (
+                'Проверьте, что одинаковые seed и --end-date дают '
+                'одинаковые файлы.'
+            )
+
+        reviews = read_csv(tmp_path / 'first', 'review')
+        assert all(row['pub_date'] < '2026-01-01' for row in reviews)
+        call_command(
+            'import_csv', path=tmp_path / 'first', jobs=1, verbosity=0
+        )
+        assert Review.objects.count() == len(reviews)
+        assert Comment.objects.count() == 600, (
+            'Проверьте, что сгенерированные CSV загружаются командой '
+            '`import_csv`.'
+        )
+
+    def test_03_skewed_popularity(self, tmp_path):
+        call_command(
+            'generate_data', output=tmp_path, verbosity=0,
+            **{**SIZES, 'users': 200, 'reviews': 2000}
+        )
+        per_title = sorted(Counter(
+            row['title_id'] for row in read_csv(tmp_path, 'review')
+        ).values(), reverse=True)
+        assert per_title[0] >= 5 * per_title[len(per_title) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно.'
+        )
+
+        call_command(
+            'generate_data', output=tmp_path, skew=0, verbosity=0,
+            **{**SIZES, 'users': 200, 'reviews': 2000}
+        )
+        per_title = Counter(
+            row['title_id'] for row in read_csv(tmp_path, 'review')
+        )
+        assert max(per_title.values()) < 3 * 2000 / 40
+
+    def test_04_one_review_per_author(self, tmp_path):
+        call_command(
+            'generate_data', output=tmp_path, verbosity=0,
+            **{**SIZES, 'users': 5, 'titles': 4}
+        )
+        reviews = read_csv(tmp_path, 'review')
+        assert len(reviews) == 20, (
+            'Проверьте, что отзывов не больше, чем пар произведение-автор.'
+        )
+        assert len({(row['title_id'], row['author']) for row in reviews}) == 20
+
+    def test_05_roles(self, tmp_path):
+        call_command(
+            'generate_data', '--roles', 'moderator=1,admin=0',
+            output=tmp_path, verbosity=0, **SIZES
+        )
+        assert {row['role'] for row in read_csv(tmp_path, 'users')} == {
+            'moderator'
+        }
+        with pytest.raises(CommandError):
+            call_command('generate_data', '--roles', 'owner=1', verbosity=0)
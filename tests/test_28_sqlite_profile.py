@@ -0,0 +1,77 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+
+from api.querybudget import QueryRecorder
+
+
+@pytest.fixture
+def production_connection(tmp_path, settings):
+    """Соединение с файлом БД в профиле production."""
+    wrapper = type(connections['default'])({
+        **connection.settings_dict,
+        **settings.SQLITE_PROFILES['production'],
+        'NAME': str(tmp_path / 'db.sqlite3'),
+    }, alias='production')
+    yield wrapper
+    wrapper.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SqliteProfile:
+
+    def test_01_pragmas(self, production_connection):
+        with production_connection.cursor() as cursor:
+            values = {}
+            for name in (
+                'journal_mode', 'synchronous', 'busy_timeout', 'mmap_size',
+                'cache_size', 'temp_store', 'foreign_keys',
+            ):
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        assert values == {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 2,
+            'foreign_keys': 1,
+        }, (
+            'Проверьте, что PRAGMAS профиля production выполняются для '
+            'каждого нового соединения.'
+        )
+        assert production_connection.settings_dict['CONN_MAX_AGE'] > 0
+
+    def test_02_begin_immediate(self, production_connection):
+        production_connection.ensure_connection()
+        with QueryRecorder() as recorder, (
+            production_connection.execute_wrapper(recorder)
+        ):
+            production_connection._start_transaction_under_autocommit()
+        assert [sql for sql, _ in recorder.queries] == ['BEGIN IMMEDIATE'], (
+            'Проверьте, что в профиле production транзакции начинаются '
+            'с BEGIN IMMEDIATE.'
+        )
+        production_connection.connection.execute('ROLLBACK')
+
+    def test_03_development_profile(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] != -64 * 1024
+        with QueryRecorder() as recorder:
+            connection._start_transaction_under_autocommit()
+        connection.connection.execute('ROLLBACK')
+        assert [sql for sql, _ in recorder.queries] == ['BEGIN']
+
+    def test_04_optimize_db(self):
+        out = StringIO()
+        call_command('optimize_db', stdout=out)
+        assert 'PRAGMA optimize' in out.getvalue()
+        out = StringIO()
+        call_command('optimize_db', analyze=True, stdout=out)
+        assert 'ANALYZE' in out.getvalue(), (
+            'Проверьте, что `optimize_db --analyze` выполняет ANALYZE.'
+        )
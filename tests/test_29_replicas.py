@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+
+from api.slowlog import TraceRecorder
+
+
+@pytest.fixture
+def replica(settings):
+    """
+    Реплика - второе соединение с той же тестовой БД в памяти, поэтому
+    данные в ней появляются сразу, а запросы различаются по псевдониму.
+    """
+    connections.settings['replica'] = dict(
+        connections['default'].settings_dict
+    )
+    settings.REPLICA_DATABASES = ['replica']
+    yield 'replica'
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+def get_aliases(client, url):
+    """
+    Псевдонимы БД запросов к url. Пользователь по токену загружается
+    до выбора реплики из основной БД, эти запросы не учитываются.
+    """
+    with TraceRecorder() as recorder:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return {
+        alias for sql, *_, alias in recorder.trace
+        if not sql.startswith('SELECT "users_customuser"')
+    }
+
+
+def create_title():
+    from reviews.models import Category, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    return Title.objects.create(name='Фильм', year=2000, category=category)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Replicas:
+
+    def test_01_reads_go_to_replica(self, client, replica):
+        title = create_title()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert get_aliases(client, url) == {replica}, (
+            'Проверьте, что чтения отзывов выполняются на реплике.'
+        )
+
+    def test_02_read_your_writes(self, user_client, admin_client, replica):
+        title = create_title()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with TraceRecorder() as recorder:
+            response = user_client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert {alias for *_, alias in recorder.trace} == {'default'}, (
+            'Проверьте, что записи выполняются в основной БД.'
+        )
+        assert get_aliases(user_client, url) == {'default'}, (
+            'Проверьте, что после записи чтения пользователя идут '
+            'в основную БД.'
+        )
+        assert get_aliases(admin_client, url) == {replica}, (
+            'Проверьте, что другие пользователи читают с реплики.'
+        )
+
+    def test_03_pin_expires(self, user_client, replica, settings):
+        settings.READ_YOUR_WRITES_WINDOW = 0
+        title = create_title()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert get_aliases(user_client, url) == {replica}
+
+    def test_04_cached_response_uses_primary(self, client, replica):
+        create_title()
+        assert get_aliases(client, '/api/v1/categories/') == {'default'}, (
+            'Проверьте, что данные для кэша ответов читаются из основной БД.'
+        )
+
+    def test_05_router(self, replica):
+        from api import replicas
+        from reviews.models import Title
+
+        router = replicas.ReplicaRouter()
+        assert router.allow_migrate(replica, 'reviews') is False
+        assert router.db_for_read(Title) is None
+
+        class Anonymous:
+            is_authenticated = False
+
+        token = replicas.read_from_replica(Anonymous())
+        try:
+            assert router.db_for_read(Title) == replica
+            assert router.db_for_write(Title) == 'default'
+            with replicas.use_primary():
+                assert router.db_for_read(Title) is None
+        finally:
+            replicas.reset(token)
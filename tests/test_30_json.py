@@ -0,0 +1,114 @@
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ErrorDetail, ParseError
+
+DATA = [
+    OrderedDict(name='Фильм «Ёлки»', slug='films', rating=6.666666666666667),
+    {
+        'text': 'строка\u2028и\u2029абзац "в кавычках" \\ \n\t',
+        'detail': ErrorDetail('Ошибка', code='invalid'),
+        'lazy': gettext_lazy('Ошибка'),
+        'pub_date': datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        'date': datetime.date(2024, 1, 2),
+        'time': datetime.time(3, 4, 5),
+        'duration': datetime.timedelta(hours=1),
+        'decimal': decimal.Decimal('7.50'),
+        'uuid': uuid.UUID(int=1),
+        'values': (1, -2, 0, True, False, None, 0.5, 10.0),
+        'nested': {'emoji': '🎬', 'empty': {}, 'list': []},
+    },
+]
+
+
+def render(renderer, data, media_type=None):
+    return renderer.render(data, media_type, {})
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Json:
+
+    @pytest.mark.parametrize('data', [
+        DATA, {}, [], 'строка', 10, None, {'big': 2 ** 70}, {1: 'one'},
+    ])
+    def test_01_renderer_matches_drf(self, data):
+        from api.renderers import JSONRenderer
+
+        assert render(JSONRenderer(), data) == render(
+            renderers.JSONRenderer(), data
+        ), 'Проверьте, что ответ кодируется так же, как JSONRenderer DRF.'
+
+    def test_02_renderer_indent(self):
+        from api.renderers import JSONRenderer
+
+        media_type = 'application/json; indent=4'
+        assert render(JSONRenderer(), DATA, media_type) == render(
+            renderers.JSONRenderer(), DATA, media_type
+        )
+
+    def test_03_renderer_without_orjson(self, monkeypatch):
+        from api import renderers as api_renderers
+
+        monkeypatch.setattr(api_renderers, 'orjson', None)
+        assert render(api_renderers.JSONRenderer(), DATA) == render(
+            renderers.JSONRenderer(), DATA
+        ), 'Проверьте, что без orjson ответ кодируется стандартным json.'
+
+    @pytest.mark.parametrize('body', [
+        '{"name": "Фильм", "year": 2000, "genre": ["drama", "comedy"]}',
+        '[1, 2.5, -3e2, true, false, null, "\\u0451\\n"]',
+        '{"big": 123456789012345678901234567890}',
+        '[-9223372036854775809, 1.5e400, "0123456789012345678901"]',
+    ])
+    def test_04_parser_matches_drf(self, body):
+        from api.parsers import JSONParser
+
+        assert JSONParser().parse(BytesIO(body.encode())) == (
+            parsers.JSONParser().parse(BytesIO(body.encode()))
+        ), 'Проверьте, что тело запроса разбирается так же, как в DRF.'
+
+    @pytest.mark.parametrize('body', [
+        b'', b'{"name": ', b'[NaN]', b'\xff',
+    ], ids=['empty', 'syntax', 'nan', 'encoding'])
+    def test_05_parser_errors(self, body):
+        from api.parsers import JSONParser
+
+        with pytest.raises(ParseError) as error:
+            JSONParser().parse(BytesIO(body))
+        with pytest.raises(ParseError) as expected:
+            parsers.JSONParser().parse(BytesIO(body))
+        assert str(error.value) == str(expected.value), (
+            'Проверьте, что ошибка разбора совпадает с ошибкой DRF.'
+        )
+
+    def test_06_api(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Фильм', 'slug': 'films'},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что API принимает тело запроса в JSON.'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', b'{"name": ', content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = admin_client.get('/api/v1/categories/')
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == renderers.JSONRenderer().render(
+            response.data
+        )
+        assert json.loads(response.content)['results'] == [
+            {'name': 'Фильм', 'slug': 'films'}
+        ]